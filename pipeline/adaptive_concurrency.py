@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+adaptive_concurrency.py - 관측한 지연/오류율로 동시 처리 수를 자동 조절 (AIMD)
+--workers 8, max_workers=30 같은 고정값 대신, 요청이 끝날 때마다 결과를 모아서
+  - 429/5xx/타임아웃이 나오면 동시 처리 수를 절반으로 (multiplicative decrease)
+  - 오류 없이 처리량이 늘면 하나씩 늘림 (additive increase)
+  - 지연만 늘고 처리량이 그대로면(이미 포화) 유지
+조절할 때마다 [AIMD] 줄로 남긴다.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+import requests
+
+MIN_WINDOW = 4              # 조절 판단에 필요한 최소 완료 수
+LATENCY_TOLERANCE = 0.5     # 기준 지연의 1.5배를 넘으면 포화로 봄
+THROUGHPUT_GAIN = 1.05      # 처리량이 이만큼 늘어야 '늘었다'고 봄
+
+
+def is_overload_status(status: int) -> bool:
+    return status == 429 or 500 <= status <= 599
+
+
+def is_overload_error(e: BaseException) -> bool:
+    """상대 서버가 과부하라는 신호인지 (429/5xx 응답, 타임아웃, 연결 오류)
+
+    HTTP 상태는 예외에 실린 값(e.status, requests.HTTPError의 응답 코드)으로만 본다.
+    메시지 문자열에는 응답 본문/페이지 번호 등 숫자가 섞여 있어 판단에 쓰지 않는다.
+    """
+    status = getattr(e, "status", None)
+    if status is None and isinstance(e, requests.HTTPError) and e.response is not None:
+        status = e.response.status_code
+    if isinstance(status, int):
+        return is_overload_status(status)
+    return isinstance(e, (requests.Timeout, requests.ConnectionError, TimeoutError, ConnectionError))
+
+
+class AimdLimiter:
+    """동시 처리 수를 AIMD로 조절하는 제한기 (스레드 안전)
+
+    with limiter.slot() as outcome:
+        ...                       # 예외는 is_overload_error로 판정
+        outcome["error"] = True   # 예외 없이 실패 신호만 받은 경우 (예: 429 응답)
+    """
+
+    def __init__(self, name: str, initial: int, min_limit: int = 1, max_limit: int = 64,
+                 increase: int = 1, decrease: float = 0.5):
+        self.name = name
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.initial = self.limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self.history: List[Tuple[float, int]] = [(time.time(), self.limit)]
+        self._baseline: Optional[float] = None     # 지금까지 본 가장 낮은 창 평균 지연
+        self._last_throughput = 0.0
+        self._decreased_at = 0.0                    # 마지막으로 줄인 시각
+        self._cond = threading.Condition()
+        self._reset_window()
+
+    def _reset_window(self):
+        self._n = 0
+        self._errors = 0
+        self._latency = 0.0
+        self._window_start = time.time()
+
+    def acquire(self) -> float:
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+        return time.time()
+
+    def release(self, started: float, outcome: Optional[str]):
+        """outcome: ok | overload | None(판단에 쓰지 않는 실패)"""
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "overload" and started < self._decreased_at:
+                # 줄이기 전에 보낸 요청의 오류 - 이미 반영했으므로 한 번 더 줄이지 않음
+                outcome = None
+            if outcome is not None:
+                self._n += 1
+                self._latency += time.time() - started
+                if outcome == "overload":
+                    self._errors += 1
+                self._maybe_adjust()
+            self._cond.notify_all()
+
+    def _maybe_adjust(self):
+        # 오류는 바로 줄이고, 늘리는 판단은 현재 동시 처리 수만큼 끝난 뒤에
+        if self._errors == 0 and self._n < max(MIN_WINDOW, self.limit):
+            return
+        now = time.time()
+        avg_latency = self._latency / self._n
+        throughput = self._n / max(now - self._window_start, 1e-6)
+        error_rate = self._errors / self._n
+        old = self.limit
+        if self._errors:
+            new = max(self.min_limit, int(old * self.decrease))
+        elif self._baseline is not None and avg_latency > self._baseline * (1 + LATENCY_TOLERANCE) \
+                and throughput < self._last_throughput * THROUGHPUT_GAIN:
+            new = old
+        else:
+            new = min(self.max_limit, old + self.increase)
+        self._baseline = avg_latency if self._baseline is None else min(self._baseline, avg_latency)
+        self._last_throughput = throughput
+        self._reset_window()
+        if new < old:
+            self._decreased_at = now
+        if new != old:
+            self.limit = new
+            self.history.append((now, new))
+            print(f"[AIMD] {self.name} 동시 처리 {old} → {new} "
+                  f"(처리량 {throughput:.2f}/초, 평균 지연 {avg_latency:.1f}초, 오류 {error_rate:.0%})")
+
+    @contextmanager
+    def slot(self):
+        started = self.acquire()
+        outcome = {"error": False}
+        result = None
+        try:
+            yield outcome
+            result = "overload" if outcome["error"] else "ok"
+        except Exception as e:
+            result = "overload" if is_overload_error(e) else None
+            raise
+        finally:
+            self.release(started, result)
+
+    def summary(self) -> str:
+        levels = [limit for _, limit in self.history]
+        return (f"{self.name} 동시 처리 {self.initial} → {self.limit} "
+                f"(범위 {min(levels)}~{max(levels)}, 조정 {len(levels) - 1}회, 상한 {self.max_limit})")
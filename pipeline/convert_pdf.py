@@ -5,145 +5,1140 @@ argparse를 사용한 개선된 CLI 인터페이스
 """
 
 import os, sys, io, json, time, requests
+import math
+import asyncio
+import itertools
 from pathlib import Path
 from dotenv import load_dotenv
 from pypdf import PdfReader, PdfWriter
 import concurrent.futures
 import threading
-from typing import List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import argparse
+import contextlib
+from ocr_cache import OcrCache, cache_key, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from poll_strategy import AdaptivePoller, DEFAULT_STATS_PATH
+from rate_limit import make_rate_limiter, DEFAULT_RATE, DEFAULT_BURST
+from job_workspace import add_job_args, resolve_job_dir, cleanup_jobs
+from page_manifest import NOT_SELECTED, PageManifest
+from page_stream import PageStreamWriter, STREAM_NAME
+from filter_pages import classify_page
+from page_dedup import find_blank_and_duplicates, NEAR_MAX_DISTANCE, NEAR_SUGGESTED_DISTANCE
+from page_payload import PayloadOptimizer, DEFAULT_JPEG_QUALITY
+from fair_share import FairShareScheduler, DEFAULT_CAPACITY, job_name
+from webhook_receiver import CompletionReceiver, DEFAULT_PORT as WEBHOOK_PORT
+from adaptive_concurrency import AimdLimiter
 
 API_URL = "https://api.mathpix.com/v3/pdf"
 
+MATHPIX_OPTIONS = {
+    "conversion_formats": {"tex.zip": False},
+    "math_inline_delimiters": ["$", "$"],
+    "rm_spaces": True,
+}
+# 업로드와 캐시 키에 같은 문자열을 쓰도록 한 번만 직렬화
+OPTIONS_JSON = json.dumps(MATHPIX_OPTIONS, sort_keys=True)
+
+# 호스트 공용 Mathpix 토큰 버킷 (main에서 설정, None이면 제한 없음)
+RATE_LIMITER = None
+
+# 업로드 페이지 크기 줄이기 (main에서 설정, None이면 add_page 결과 그대로 업로드)
+PAYLOAD_OPTIMIZER = None
+
+# 사용자별 공정 분배 스케줄러 (main에서 설정, None이면 이 작업의 워커 수만큼 바로 처리)
+SCHEDULER = None
+
+# 앞쪽 페이지 미리보기 (main에서 설정, --priority-pages)
+PREVIEW = None
+
+# 동시 처리 페이지 수 자동 조절 (main에서 설정, --auto-workers, None이면 스레드 수 고정)
+LIMITER = None
+
+def limit_slot():
+    """AIMD 제한기가 정한 동시 처리 수 안에서 페이지 하나 처리 (제한기가 없으면 아무것도 안 함)"""
+    return LIMITER.slot() if LIMITER is not None else contextlib.nullcontext()
+
+def fair_slot():
+    """페이지 하나 처리하는 동안 잡는 공용 Mathpix 슬롯 (스케줄러가 없으면 아무것도 안 함)"""
+    return SCHEDULER.slot() if SCHEDULER is not None else contextlib.nullcontext()
+
+def fair_slot_async():
+    return SCHEDULER.slot_async() if SCHEDULER is not None else contextlib.nullcontext()
+
+def fair_acquire():
+    """업로드~다운로드가 다른 스레드에서 끝나는 경우(웹훅 모드)용 슬롯 받기/돌려주기"""
+    if SCHEDULER is not None:
+        SCHEDULER.acquire()
+
+def fair_release(done: bool = True):
+    if SCHEDULER is not None:
+        SCHEDULER.release(done=done)
+
+def throttle():
+    """Mathpix API 요청 직전에 공용 토큰 버킷에서 토큰 하나 받기"""
+    if RATE_LIMITER is not None:
+        RATE_LIMITER.acquire()
+
+async def throttle_async():
+    if RATE_LIMITER is not None:
+        await RATE_LIMITER.acquire_async()
+
 def die(msg: str):
     print(f"[ERROR] {msg}")
     sys.exit(1)
 
+def page_to_pdf_bytes(page) -> bytes:
+    """PdfReader의 페이지 객체 하나를 단일 페이지 PDF 바이트로 변환"""
+    writer = PdfWriter()
+    writer.add_page(page)
+    bio = io.BytesIO()
+    writer.write(bio)
+    return bio.getvalue()
+
 def extract_single_page_bytes(pdf_path: Path, page_idx: int) -> bytes:
     """원본 PDF에서 page_idx(0-base) 한 페이지만 떼어 PDF 바이트 반환"""
     reader = PdfReader(str(pdf_path))
     if not (0 <= page_idx < len(reader.pages)):
         raise IndexError("page_index out of range")
-    writer = PdfWriter()
-    writer.add_page(reader.pages[page_idx])
-    bio = io.BytesIO()
-    writer.write(bio)
-    return bio.getvalue()
+    return page_to_pdf_bytes(reader.pages[page_idx])
 
-def mathpix_upload_and_get_id(pdf_bytes: bytes, headers: dict) -> str:
+def iter_single_pages(reader: PdfReader, skip: Optional[set] = None) -> Iterator[Tuple[int, bytes]]:
+    """이미 열린 PdfReader에서 (page_idx, 단일 페이지 PDF 바이트)를 순서대로 지연 생성
+
+    문서 파싱은 호출 측에서 한 번만 하고, 페이지 바이트는 소비되는 시점에 만든다.
+    skip에 든 페이지(이미 완료됐거나 OCR 전 판정으로 건너뛴 페이지)는 건너뛴다.
+    PAYLOAD_OPTIMIZER가 설정돼 있으면 쓰지 않는 리소스를 뺀 작은 PDF를 만든다.
+    """
+    for page_idx, page in enumerate(reader.pages):
+        if skip and page_idx in skip:
+            continue
+        if PAYLOAD_OPTIMIZER is not None:
+            yield page_idx, PAYLOAD_OPTIMIZER.page_bytes(page_idx, page)
+        else:
+            yield page_idx, page_to_pdf_bytes(page)
+
+class MathpixHTTPError(RuntimeError):
+    """Mathpix가 200이 아닌 HTTP 응답을 줌 (status로 429/5xx 과부하 여부를 판단)"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def mathpix_upload_and_get_id(pdf_bytes: bytes, headers: dict, options_json: str = OPTIONS_JSON) -> str:
     """한 페이지 PDF 업로드 → pdf_id 반환"""
-    options = {
-        "conversion_formats": {"tex.zip": False},
-        "math_inline_delimiters": ["$", "$"],
-        "rm_spaces": True,
-    }
     files = {"file": ("page.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
-    data  = {"options_json": json.dumps(options)}
+    data  = {"options_json": options_json}
+    throttle()
     r = requests.post(API_URL, headers=headers, files=files, data=data, timeout=300)
     if r.status_code != 200:
-        raise RuntimeError(f"Upload failed: {r.status_code} {r.text[:200]}")
+        raise MathpixHTTPError(r.status_code, f"Upload failed: {r.status_code} {r.text[:200]}")
     pdf_id = r.json().get("pdf_id")
     if not pdf_id:
         raise RuntimeError(f"No pdf_id in response: {r.text[:200]}")
     return pdf_id
 
-def poll_until_done(pdf_id: str, headers: dict, interval=2, timeout=300):
-    """변환 완료까지 폴링"""
+def poll_delays(interval: float, poller: Optional[AdaptivePoller], page_size: int) -> Iterator[float]:
+    """폴링 전 대기 시간 목록 (poller가 없으면 즉시 1회 후 고정 간격)"""
+    if poller is not None:
+        return poller.delays(page_size)
+    return itertools.chain([0], itertools.repeat(interval))
+
+class HedgeLost(Exception):
+    """같은 페이지의 다른 요청(헤지)이 먼저 끝나서 중단됨"""
+
+def poll_until_done(pdf_id: str, headers: dict, interval=2, timeout=300,
+                    poller: Optional[AdaptivePoller] = None, page_size: int = 0,
+                    stop: Optional[threading.Event] = None) -> int:
+    """변환 완료까지 폴링, 상태 조회 횟수 반환 (stop이 설정되면 HedgeLost)"""
     url = f"{API_URL}/{pdf_id}"
     t0 = time.time()
-    while True:
-        s = requests.get(url, headers=headers, timeout=60).json()
+    prev = None  # 마지막으로 '처리 중'을 본 시각
+    polls = 0
+    for delay in poll_delays(interval, poller, page_size):
+        if stop is None:
+            time.sleep(delay)
+        elif stop.wait(delay):
+            raise HedgeLost(pdf_id)
+        throttle()
+        r = requests.get(url, headers=headers, timeout=60)
+        if r.status_code != 200:
+            raise MathpixHTTPError(r.status_code, f"Status check failed: {r.status_code} {r.text[:200]}")
+        s = r.json()
+        polls += 1
+        now = time.time()
         st = s.get("status")
         if st == "completed":
-            return
+            if poller is not None:
+                poller.record_done(page_size, t0, prev, now, polls)
+            return polls
         if st in ("error", "failed"):
             raise RuntimeError(f"Processing error: {s}")
-        if time.time() - t0 > timeout:
+        if now - t0 > timeout:
             raise TimeoutError("Mathpix processing timeout")
-        time.sleep(interval)
+        prev = now
 
 def download_mmd(pdf_id: str, headers: dict) -> str:
     """해당 pdf_id의 mmd 텍스트 다운로드"""
     url = f"{API_URL}/{pdf_id}.mmd"
+    throttle()
     r = requests.get(url, headers=headers, timeout=300)
     if r.status_code != 200:
-        raise RuntimeError(f"mmd download failed: {r.status_code}")
+        raise MathpixHTTPError(r.status_code, f"mmd download failed: {r.status_code}")
     return r.text
 
-def process_single_page(page_data: Tuple[int, bytes, dict]) -> Tuple[int, str]:
-    """단일 페이지 처리 (병렬 처리용)"""
+def process_single_page(page_data: Tuple[int, bytes, dict], cache: Optional[OcrCache] = None,
+                        poller: Optional[AdaptivePoller] = None,
+                        manifest: Optional[PageManifest] = None,
+                        stop: Optional[threading.Event] = None,
+                        on_request: Optional[Callable[[], None]] = None) -> Tuple[int, str]:
+    """단일 페이지 처리 (병렬 처리용)
+
+    stop은 헤지 요청과 공유하는 이벤트로, 다른 쪽이 먼저 끝나면 폴링을 멈추고 HedgeLost를 던진다.
+    on_request는 캐시에 없어 Mathpix로 요청을 보내기 직전에 호출된다.
+    """
     page_idx, pdf_bytes, headers = page_data
     page_no = page_idx + 1
-    
+
+    key = None
+    if cache is not None:
+        key = cache_key(pdf_bytes, OPTIONS_JSON)
+        mmd = cache.get(key)
+        if mmd is not None:
+            print(f"[OK] page {page_no} 캐시 적중, 업로드 생략")
+            if manifest is not None:
+                manifest.mark_done(page_idx, mmd)
+            return page_idx, mmd
+
+    if on_request is not None:
+        on_request()
+
+    # 이전 실행에서 업로드까지 끝난 페이지는 같은 pdf_id로 결과만 다시 받아 본다
+    prev_pdf_id = manifest.entry(page_idx).get("pdf_id") if manifest is not None else None
+    if prev_pdf_id:
+        try:
+            print(f"[*] page {page_no} 이전 업로드 재사용 (pdf_id={prev_pdf_id})")
+            polls = poll_until_done(prev_pdf_id, headers, poller=poller, page_size=len(pdf_bytes))
+            mmd = download_mmd(prev_pdf_id, headers)
+            if cache is not None:
+                cache.put(key, mmd)
+            manifest.mark_done(page_idx, mmd)
+            print(f"[OK] page {page_no} 완료! (상태 조회 {polls}회)")
+            return page_idx, mmd
+        except Exception as e:
+            print(f"[*] page {page_no} 이전 업로드 재사용 실패, 다시 업로드: {e}")
+
     print(f"[*] page {page_no} 업로드 시작...")
     
     try:
         # 업로드
         pdf_id = mathpix_upload_and_get_id(pdf_bytes, headers)
         print(f"[*] page {page_no} 업로드 완료 (pdf_id={pdf_id})")
+        if manifest is not None:
+            manifest.mark_uploaded(page_idx, pdf_id)
         
         # 대기
         print(f"[*] page {page_no} 변환 대기 중...")
-        poll_until_done(pdf_id, headers)
+        polls = poll_until_done(pdf_id, headers, poller=poller, page_size=len(pdf_bytes), stop=stop)
         
         # 다운로드
         print(f"[*] page {page_no} mmd 다운로드 중...")
         mmd = download_mmd(pdf_id, headers)
+        if cache is not None:
+            cache.put(key, mmd)
+        if manifest is not None:
+            manifest.mark_done(page_idx, mmd)
         
-        print(f"[OK] page {page_no} 완료!")
+        print(f"[OK] page {page_no} 완료! (상태 조회 {polls}회)")
         return page_idx, mmd
         
+    except HedgeLost:
+        print(f"[*] page {page_no} 다른 요청이 먼저 완료되어 중단")
+        raise
     except Exception as e:
         print(f"[ERROR] page {page_no} 실패: {e}")
+        if manifest is not None:
+            manifest.mark_failed(page_idx, e)
         raise
 
-def process_pages_parallel(pdf_path: Path, headers: dict, max_workers: int = 3) -> List[Tuple[int, str]]:
-    """페이지들을 병렬로 처리"""
-    reader = PdfReader(str(pdf_path))
-    num_pages = len(reader.pages)
-    
+# ----------------- OCR 전 판정 (텍스트 레이어) -----------------
+TRIAGE_MIN_CHARS = 200      # 이보다 글자가 적으면 텍스트 레이어를 믿지 않음
+TRIAGE_MIN_SOLUTION = 30    # 해설 점수가 이 이상일 때만 해설로 확신
+
+def triage_page_text(page_no: int, text: str) -> Optional[str]:
+    """텍스트 레이어로 해설/정답표 페이지를 확신할 수 있으면 사유 반환, 아니면 None
+
+    filter_pages.classify_page의 판정을 그대로 쓰되, OCR 결과와 달리 수식이 빠진
+    텍스트라서 여유를 두고 확실한 경우만 건너뛴다.
+      - 정답표(ans_table)로 판정
+      - 해설 점수가 TRIAGE_MIN_SOLUTION 이상이면서 문항 점수의 2배 이상
+    """
+    if len("".join(text.split())) < TRIAGE_MIN_CHARS:
+        return None
+    st = classify_page(page_no, text.splitlines())
+    if st.keep:
+        return None
+    if st.reason == "DROP_ANSWER_TABLE" or st.ans_table:
+        return "DROP_ANSWER_TABLE"
+    if st.solution_score >= TRIAGE_MIN_SOLUTION and st.solution_score >= 2 * st.question_score:
+        return st.reason
+    return None
+
+def triage_pages(reader: PdfReader, manifest: PageManifest) -> int:
+    """PDF 자체 텍스트 레이어로 해설/정답 페이지를 미리 골라 매니페스트에 skipped로 기록"""
+    t0 = time.time()
+    done = set(manifest.done_pages()) | set(manifest.skipped_pages())
+    skipped = 0
+    for page_idx, page in enumerate(reader.pages):
+        if page_idx in done:
+            continue
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            print(f"[TRIAGE] page {page_idx + 1} 텍스트 추출 실패, OCR 진행: {e}")
+            continue
+        reason = triage_page_text(page_idx + 1, text)
+        if reason:
+            manifest.mark_skipped(page_idx, reason)
+            skipped += 1
+            print(f"[TRIAGE] page {page_idx + 1} OCR 생략 ({reason})")
+    print(f"[TRIAGE] 텍스트 레이어 판정 {time.time() - t0:.2f}초, {skipped}개 페이지 OCR 생략")
+    return skipped
+
+# ----------------- 페이지 범위 / 앞쪽 페이지 미리보기 -----------------
+def parse_page_ranges(spec: str, num_pages: int) -> List[int]:
+    """ "1-10,15,20-" 형식(1-base, 끝 생략 시 마지막 페이지까지) → 0-base 페이지 인덱스 목록"""
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        try:
+            first = int(start) if start.strip() else 1
+            last = (int(end) if end.strip() else num_pages) if sep else first
+        except ValueError:
+            raise ValueError(f"잘못된 페이지 범위: {part}")
+        if first < 1 or last < first:
+            raise ValueError(f"잘못된 페이지 범위: {part}")
+        pages.update(range(first - 1, min(last, num_pages)))
+    if not pages:
+        raise ValueError(f"선택된 페이지가 없습니다: {spec} (총 {num_pages}p)")
+    return sorted(pages)
+
+def write_combined(output_file: Path, results: List[Tuple[int, str]]):
+    """페이지 결과를 <<<PAGE n>>> 구분자로 합쳐 저장 (results는 페이지 순서)"""
+    combined = []
+    for page_idx, mmd in results:
+        page_no = page_idx + 1
+        combined.append(f"<<<PAGE {page_no}>>>")
+        combined.append(mmd)
+    output_file.write_text("\n".join(combined), encoding="utf-8")
+
+class PriorityPreview:
+    """앞쪽 우선 페이지가 모두 끝나는 즉시 그 페이지들만으로 결과 파일을 먼저 써 둔다
+
+    나머지 페이지는 계속 처리되고, 전체가 끝나면 main에서 같은 파일을 전체 결과로 다시 쓴다.
+    """
+
+    def __init__(self, pages: List[int], output_file: Path):
+        self.pending = set(pages)
+        self.pages = {}
+        self.output_file = output_file
+        self.written = False
+        self._lock = threading.Lock()
+
+    def add(self, results: List[Tuple[int, str]], skipped: Iterable[int] = ()):
+        """완료된 페이지 반영, skipped(컷오프로 취소된 페이지 등)는 더 기다리지 않음"""
+        with self._lock:
+            if self.written:
+                return
+            self.pending.difference_update(skipped)
+            for page_idx, mmd in results:
+                if page_idx in self.pending:
+                    self.pending.discard(page_idx)
+                    self.pages[page_idx] = mmd
+            if self.pending:
+                return
+            self.written = True
+            if not self.pages:
+                return
+            write_combined(self.output_file, sorted(self.pages.items()))
+        print(f"[PDF미리보기] 앞쪽 {len(self.pages)}페이지 먼저 저장: {self.output_file}")
+
+def record_result(result: Tuple[int, str], results: List[Tuple[int, str]],
+                  duplicates: Optional[Dict[int, List[int]]] = None,
+                  manifest: Optional[PageManifest] = None,
+                  stream: Optional[PageStreamWriter] = None):
+    """완료된 페이지 결과 반영: 결과 목록, 스트림, 중복 페이지 복사, 미리보기"""
+    results.append(result)
+    if stream is not None:
+        stream.write_page(*result)
+    copies = fan_out_duplicates(result, duplicates, manifest, stream)
+    results.extend(copies)
+    if PREVIEW is not None:
+        PREVIEW.add([result] + copies)
+
+# ----------------- 빈/중복 페이지 판정 -----------------
+def dedup_pages(reader: PdfReader, pdf_path: Path, manifest: PageManifest,
+                near_max_distance: int = NEAR_MAX_DISTANCE) -> Tuple[Dict[int, List[int]], int]:
+    """빈 페이지는 매니페스트에 skipped로 기록하고, (원본 → 중복 페이지 목록, 생략한 페이지 수) 반환
+
+    중복 페이지는 OCR하지 않고 원본 결과가 나오는 즉시 복사한다 (fan_out_duplicates).
+    원본이 이미 OCR 생략(--triage) 판정이면 중복 페이지도 같이 건너뛴다.
+    """
+    found = find_blank_and_duplicates(reader, pdf_path, near_max_distance=near_max_distance)
+    done = set(manifest.done_pages())
+    skipped = set(manifest.skipped_pages())
+    saved = 0
+    for page_idx in found.blank:
+        if page_idx in done or page_idx in skipped:
+            continue
+        manifest.mark_skipped(page_idx, "BLANK_PAGE")
+        saved += 1
+        print(f"[DEDUP] page {page_idx + 1} 빈 페이지, OCR 생략")
+
+    duplicates = {}
+    for original, dups in found.duplicates.items():
+        dups = [d for d in dups if d not in done and d not in skipped]
+        if not dups:
+            continue
+        saved += len(dups)
+        if original in skipped:
+            for dup_idx in dups:
+                manifest.mark_skipped(dup_idx, f"DUPLICATE_OF_{original + 1}")
+            continue
+        duplicates[original] = dups
+        print(f"[DEDUP] page {', '.join(str(d + 1) for d in dups)} → page {original + 1} 결과 재사용")
+    print(f"[DEDUP] {found.summary()}")
+    return duplicates, saved
+
+def fan_out_duplicates(result: Tuple[int, str], duplicates: Optional[Dict[int, List[int]]],
+                       manifest: Optional[PageManifest] = None,
+                       stream: Optional[PageStreamWriter] = None) -> List[Tuple[int, str]]:
+    """원본 페이지 결과를 중복 페이지에 복사 (매니페스트/스트림에도 기록)"""
+    page_idx, mmd = result
+    copies = [(dup_idx, mmd) for dup_idx in (duplicates or {}).get(page_idx, ())]
+    for dup_idx, _ in copies:
+        if manifest is not None:
+            manifest.mark_done(dup_idx, mmd)
+        if stream is not None:
+            stream.write_page(dup_idx, mmd)
+    return copies
+
+# ----------------- 해설 구간 감지 후 조기 중단 -----------------
+SOLUTION_DROP_REASONS = ("DROP_NO_QUESTION_END", "DROP_SOLUTION_OVER_QUESTION")
+
+class SolutionRunDetector:
+    """도착한 페이지 mmd를 classify_page로 판정해서, 해설 판정 페이지가
+    run_length개 이상 연속(페이지 번호 기준)으로 나오면 그 구간의 끝 페이지를 컷오프로 정한다.
+
+    페이지는 완료 순서대로 들어오므로 판정 결과를 모아 두고 매번 연속 구간을 다시 확인한다.
+    """
+
+    def __init__(self, run_length: int):
+        self.run_length = run_length
+        self.is_solution = {}
+        self.cutoff: Optional[int] = None  # 이 페이지(0-base) 이후는 OCR하지 않음
+
+    def feed(self, page_idx: int, mmd: str) -> bool:
+        """페이지 결과 반영, 이번에 컷오프가 새로 정해졌으면 True"""
+        if self.run_length <= 0 or self.cutoff is not None:
+            return False
+        st = classify_page(page_idx + 1, mmd.splitlines())
+        self.is_solution[page_idx] = st.reason in SOLUTION_DROP_REASONS
+        # page_idx를 포함하는 연속 해설 구간 확인
+        if not self.is_solution[page_idx]:
+            return False
+        lo = hi = page_idx
+        while self.is_solution.get(lo - 1):
+            lo -= 1
+        while self.is_solution.get(hi + 1):
+            hi += 1
+        if hi - lo + 1 >= self.run_length:
+            self.cutoff = hi
+            print(f"[CUTOFF] page {lo + 1}~{hi + 1} 연속 해설 판정 → page {hi + 2}부터 대기 중인 OCR 취소")
+            return True
+        return False
+
+    def beyond(self, page_idx: int) -> bool:
+        return self.cutoff is not None and page_idx > self.cutoff
+
+def mark_cancelled(pages: List[int], manifest: Optional[PageManifest], stream: Optional[PageStreamWriter],
+                   duplicates: Optional[Dict[int, List[int]]] = None):
+    """해설 구간 이후라서 OCR하지 않은 페이지 기록 (취소된 원본의 중복 페이지 포함)"""
+    pages = list(pages) + [d for page_idx in pages for d in (duplicates or {}).get(page_idx, ())]
+    for page_idx in sorted(pages):
+        if manifest is not None:
+            manifest.mark_skipped(page_idx, "CANCELLED_AFTER_SOLUTION_RUN")
+        if stream is not None:
+            stream.skip_page(page_idx)
+    if PREVIEW is not None:
+        PREVIEW.add([], skipped=pages)
+    if pages:
+        print(f"[CUTOFF] {len(pages)}개 페이지 OCR 취소")
+
+# ----------------- 느린 페이지 헤지 요청 -----------------
+HEDGE_PERCENTILE = 0.9      # 완료된 페이지 처리 시간의 이 분위수를 넘으면 헤지
+HEDGE_MIN_SAMPLES = 5       # 분위수를 믿기 위한 최소 완료 페이지 수
+HEDGE_CHECK_INTERVAL = 0.5  # 처리 중인 페이지 점검 간격(초)
+
+class Hedger:
+    """완료된 페이지 처리 시간의 p90보다 오래 걸리는 페이지에 같은 요청을 한 번 더 보낸다
+
+    ratio: 실제로 Mathpix에 요청을 보낸 페이지 중 헤지할 수 있는 최대 비율.
+    캐시 적중/OCR 전 판정/중복 복사 페이지는 요청을 안 보내므로 예산에 넣지 않는다.
+    먼저 끝난 쪽 결과를 쓰고 다른 쪽은 페이지별 stop 이벤트로 중단시킨다.
+    """
+
+    def __init__(self, ratio: float):
+        self.ratio = ratio
+        self.latencies: List[float] = []
+        self.started: Dict[int, float] = {}
+        self.stops: Dict[int, threading.Event] = {}
+        self.hedged = set()
+        self.wins = 0
+
+    @property
+    def budget(self) -> int:
+        """지금까지 요청을 보낸 페이지 수 기준 헤지 가능 횟수"""
+        return max(1, math.ceil(len(self.started) * self.ratio))
+
+    def start(self, page_idx: int):
+        """워커가 페이지 요청을 실제로 보낼 때 호출 (대기열 시간/캐시 적중 제외)"""
+        self.started.setdefault(page_idx, time.time())
+
+    def stop_event(self, page_idx: int) -> threading.Event:
+        return self.stops.setdefault(page_idx, threading.Event())
+
+    def threshold(self) -> Optional[float]:
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE))]
+
+    def finish(self, page_idx: int, by_hedge: bool):
+        """페이지 완료 기록, 같은 페이지의 남은 요청 중단"""
+        started = self.started.get(page_idx)
+        if started is not None:
+            self.latencies.append(time.time() - started)
+        if by_hedge:
+            self.wins += 1
+        self.stop_event(page_idx).set()
+
+    def stragglers(self, in_flight: List[int]) -> List[int]:
+        """지금 헤지할 페이지 목록 (예산 안에서, 페이지당 한 번)"""
+        limit = self.threshold()
+        if limit is None:
+            return []
+        now = time.time()
+        picked = []
+        for page_idx in in_flight:
+            if len(self.hedged) >= self.budget:
+                break
+            started = self.started.get(page_idx)
+            if page_idx not in self.hedged and started is not None and now - started > limit:
+                self.hedged.add(page_idx)
+                picked.append(page_idx)
+        return picked
+
+    def summary(self) -> str:
+        limit = self.threshold()
+        limit_text = f"{limit:.1f}초" if limit is not None else "-"
+        return f"헤지 요청 {len(self.hedged)}회 (예산 {self.budget}), 헤지가 먼저 끝난 페이지 {self.wins}개, p90 {limit_text}"
+
+def print_progress(completed_count: int, total_pages: int, start_time: float):
+    """진행상황 및 예상 시간 출력 (app.cjs가 [PDF진행] 줄을 파싱함)"""
+    elapsed_time = time.time() - start_time
+    avg_time_per_page = elapsed_time / completed_count
+    remaining_pages = total_pages - completed_count
+    estimated_remaining_time = avg_time_per_page * remaining_pages
+
+    percentage = int((completed_count / total_pages) * 100)
+    print(f"[PDF진행] {completed_count}/{total_pages} 페이지 ({percentage}%) - 예상 남은 시간: {int(estimated_remaining_time)}초")
+
+def restore_done_pages(manifest: Optional[PageManifest],
+                       stream: Optional[PageStreamWriter] = None,
+                       duplicates: Optional[Dict[int, List[int]]] = None) -> List[Tuple[int, str]]:
+    """매니페스트에서 이미 완료된 페이지 결과 복원 (--resume)
+
+    복원한 원본 페이지에 딸린 중복 페이지도 여기서 결과를 복사한다.
+    """
+    if manifest is None:
+        return []
+    restored = [(page_idx, manifest.load_mmd(page_idx)) for page_idx in manifest.done_pages()]
+    if restored:
+        print(f"[*] 이전 실행에서 완료된 {len(restored)}개 페이지 재사용")
+    if stream is not None:
+        for page_idx, mmd in restored:
+            stream.write_page(page_idx, mmd)
+        for page_idx in manifest.skipped_pages():
+            stream.skip_page(page_idx)
+    for result in list(restored):
+        restored.extend(fan_out_duplicates(result, duplicates, manifest, stream))
+    if PREVIEW is not None:
+        PREVIEW.add(restored)
+    return restored
+
+def pages_to_skip(manifest: Optional[PageManifest], restored: List[Tuple[int, str]],
+                  duplicates: Optional[Dict[int, List[int]]] = None) -> set:
+    """이번 실행에서 OCR하지 않을 페이지 (이미 완료 + 사전 판정으로 건너뜀 + 중복)"""
+    skip = {page_idx for page_idx, _ in restored}
+    if manifest is not None:
+        skip.update(manifest.skipped_pages())
+    for dups in (duplicates or {}).values():
+        skip.update(dups)
+    return skip
+
+def raise_if_failed(failed: List[int]):
+    if failed:
+        pages = ", ".join(str(i + 1) for i in sorted(failed))
+        raise RuntimeError(f"{len(failed)}개 페이지 실패 (page {pages}) - --resume으로 실패한 페이지만 다시 처리할 수 있습니다")
+
+def process_pages_parallel(reader: PdfReader, headers: dict, max_workers: int = 3,
+                           cache: Optional[OcrCache] = None,
+                           poller: Optional[AdaptivePoller] = None,
+                           manifest: Optional[PageManifest] = None,
+                           stream: Optional[PageStreamWriter] = None,
+                           stop_run: int = 0,
+                           duplicates: Optional[Dict[int, List[int]]] = None,
+                           hedger: Optional[Hedger] = None) -> List[Tuple[int, str]]:
+    """페이지들을 병렬로 처리
+
+    stream이 있으면 페이지가 끝나는 대로 스트림에 덧붙여 후속 단계가 바로 읽을 수 있게 한다.
+    페이지 분리는 iter_single_pages로 지연 생성하고, 제출 대기열은 max_workers * 2개로
+    제한한다. 워커가 하나 끝날 때마다 다음 페이지를 만들어 넣으므로 메모리에 올라가는
+    페이지 바이트 수가 문서 길이와 무관하게 일정하다.
+
+    매니페스트가 있으면 완료된 페이지는 건너뛰고, 실패한 페이지가 있어도 나머지를
+    끝까지 처리한 뒤 실패 목록과 함께 예외를 던진다.
+
+    stop_run > 0이면 해설 페이지가 stop_run개 연속으로 나온 뒤의 대기 중인 페이지는
+    취소한다 (이미 처리 중인 페이지는 끝까지 받는다).
+    duplicates(원본 → 중복 페이지)의 중복 페이지는 OCR하지 않고 원본 결과를 복사한다.
+
+    hedger가 있으면 p90보다 오래 걸리는 페이지를 별도 스레드 풀에서 한 번 더 요청하고
+    먼저 끝난 결과를 쓴다. 헤지 요청은 매니페스트를 건드리지 않고, 이긴 경우에만 여기서 기록한다.
+
+    LIMITER가 설정돼 있으면 max_workers는 스레드 풀 상한이고, 실제 동시 처리 수는
+    제한기가 지연/오류율을 보고 그 안에서 조절한다.
+    """
+    results = restore_done_pages(manifest, stream, duplicates)
+    skip = pages_to_skip(manifest, results, duplicates)
+    num_pages = len(reader.pages) - len(skip)
+    max_pending = max_workers * 2
+    detector = SolutionRunDetector(stop_run)
+    for page_idx, mmd in sorted(results):
+        detector.feed(page_idx, mmd)
+
     print(f"[*] {num_pages}개 페이지를 {max_workers}개 스레드로 병렬 처리...")
-    
-    # 페이지 데이터 준비
-    page_data_list = []
-    for i in range(num_pages):
-        pdf_bytes = extract_single_page_bytes(pdf_path, i)
-        page_data_list.append((i, pdf_bytes, headers))
-    
-    # 병렬 처리
-    results = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # 모든 작업 제출
-        future_to_page = {
-            executor.submit(process_single_page, page_data): page_data[0] 
-            for page_data in page_data_list
-        }
-        
-        # 결과 수집
+
+    pages = iter_single_pages(reader, skip)
+    failed = []
+    cancelled = []
+    finished = set()
+    hedge_workers = max(1, max_workers // 2)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=hedge_workers) as hedge_executor:
+        future_to_page = {}
+        hedge_futures = set()
+        in_flight_bytes = {}  # 헤지 요청에 다시 쓸 페이지 바이트 (처리 중인 페이지만)
+
+        def run_page(page_idx: int, pdf_bytes: bytes, page_manifest: Optional[PageManifest]) -> Tuple[int, str]:
+            with fair_slot(), limit_slot():  # 공용 슬롯 대기 시간은 AIMD 지연에 넣지 않음
+                if hedger is None:
+                    return process_single_page((page_idx, pdf_bytes, headers), cache, poller, page_manifest)
+                return process_single_page((page_idx, pdf_bytes, headers), cache, poller, page_manifest,
+                                           hedger.stop_event(page_idx), lambda: hedger.start(page_idx))
+
+        def submit_next() -> bool:
+            """다음 페이지를 하나 떼어 제출 (남은 페이지가 없으면 False)"""
+            nonlocal pages
+            try:
+                page_idx, pdf_bytes = next(pages)
+            except StopIteration:
+                return False
+            if detector.beyond(page_idx):
+                # 페이지는 순서대로 나오므로 이후 페이지도 모두 컷오프 뒤
+                cancelled.append(page_idx)
+                cancelled.extend(i for i in range(page_idx + 1, len(reader.pages)) if i not in skip)
+                pages = iter(())
+                return False
+            future = executor.submit(run_page, page_idx, pdf_bytes, manifest)
+            future_to_page[future] = page_idx
+            if hedger is not None:
+                in_flight_bytes[page_idx] = pdf_bytes
+            return True
+
+        # 대기열 채우기
+        while len(future_to_page) < max_pending and submit_next():
+            pass
+
+        # 결과 수집 (하나 끝날 때마다 대기열 보충)
         completed_count = 0
-        total_pages = len(future_to_page)
+        total_pages = num_pages
         start_time = time.time()
 
-        for future in concurrent.futures.as_completed(future_to_page):
-            page_idx = future_to_page[future]
+        while future_to_page:
+            done, _ = concurrent.futures.wait(
+                future_to_page, timeout=HEDGE_CHECK_INTERVAL if hedger is not None else None,
+                return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                page_idx = future_to_page.pop(future)
+                by_hedge = future in hedge_futures
+                hedge_futures.discard(future)
+                if page_idx in finished:
+                    continue  # 같은 페이지의 다른 요청이 이미 끝남
+                try:
+                    result = future.result()
+                    finished.add(page_idx)
+                    in_flight_bytes.pop(page_idx, None)
+                    if hedger is not None:
+                        hedger.finish(page_idx, by_hedge)
+                        if by_hedge:
+                            print(f"[HEDGE] page {page_idx + 1} 헤지 요청이 먼저 완료")
+                            if manifest is not None:
+                                manifest.mark_done(*result)
+                    record_result(result, results, duplicates, manifest, stream)
+                    completed_count += 1
+                    if detector.feed(*result):
+                        # 아직 시작 안 한 컷오프 이후 페이지 취소
+                        for pending, pending_idx in list(future_to_page.items()):
+                            if pending not in hedge_futures and detector.beyond(pending_idx) and pending.cancel():
+                                future_to_page.pop(pending)
+                                cancelled.append(pending_idx)
+                    print_progress(completed_count, total_pages - len(cancelled), start_time)
+
+                except Exception as e:
+                    if page_idx in future_to_page.values():
+                        # 같은 페이지의 다른 요청(헤지/원 요청)이 아직 처리 중
+                        print(f"[HEDGE] page {page_idx + 1} 요청 하나 실패, 남은 요청 대기: {e}")
+                        continue
+                    in_flight_bytes.pop(page_idx, None)
+                    print(f"[ERROR] 페이지 {page_idx + 1} 처리 실패: {e}")
+                    if manifest is None:
+                        for pending in future_to_page:
+                            pending.cancel()
+                        raise
+                    failed.append(page_idx)
+
+            if hedger is not None:
+                for page_idx in hedger.stragglers(sorted(set(future_to_page.values()))):
+                    print(f"[HEDGE] page {page_idx + 1} 처리 시간이 p90 초과 → 같은 요청 한 번 더")
+                    hedge = hedge_executor.submit(run_page, page_idx, in_flight_bytes[page_idx], None)
+                    future_to_page[hedge] = page_idx
+                    hedge_futures.add(hedge)
+
+            while len(future_to_page) < max_pending and submit_next():
+                pass
+
+    mark_cancelled(cancelled, manifest, stream, duplicates)
+    raise_if_failed(failed)
+
+    # 페이지 순서대로 정렬
+    results.sort(key=lambda x: x[0])
+    return results
+
+# ----------------- 비동기(aiohttp) 모드 -----------------
+async def mathpix_upload_and_get_id_async(session, pdf_bytes: bytes) -> str:
+    """한 페이지 PDF 업로드 → pdf_id 반환 (비동기)"""
+    import aiohttp
+    form = aiohttp.FormData()
+    form.add_field("file", pdf_bytes, filename="page.pdf", content_type="application/pdf")
+    form.add_field("options_json", OPTIONS_JSON)
+    await throttle_async()
+    async with session.post(API_URL, data=form) as r:
+        text = await r.text()
+        if r.status != 200:
+            raise MathpixHTTPError(r.status, f"Upload failed: {r.status} {text[:200]}")
+        pdf_id = json.loads(text).get("pdf_id")
+    if not pdf_id:
+        raise RuntimeError(f"No pdf_id in response: {text[:200]}")
+    return pdf_id
+
+async def poll_until_done_async(session, pdf_id: str, interval=2, timeout=300,
+                                poller: Optional[AdaptivePoller] = None, page_size: int = 0) -> int:
+    """변환 완료까지 폴링, 상태 조회 횟수 반환 (비동기)"""
+    url = f"{API_URL}/{pdf_id}"
+    t0 = time.time()
+    prev = None  # 마지막으로 '처리 중'을 본 시각
+    polls = 0
+    for delay in poll_delays(interval, poller, page_size):
+        await asyncio.sleep(delay)
+        await throttle_async()
+        async with session.get(url) as r:
+            if r.status != 200:
+                raise MathpixHTTPError(r.status, f"Status check failed: {r.status} {(await r.text())[:200]}")
+            s = await r.json(content_type=None)
+        polls += 1
+        now = time.time()
+        st = s.get("status")
+        if st == "completed":
+            if poller is not None:
+                poller.record_done(page_size, t0, prev, now, polls)
+            return polls
+        if st in ("error", "failed"):
+            raise RuntimeError(f"Processing error: {s}")
+        if now - t0 > timeout:
+            raise TimeoutError("Mathpix processing timeout")
+        prev = now
+
+async def download_mmd_async(session, pdf_id: str) -> str:
+    """해당 pdf_id의 mmd 텍스트 다운로드 (비동기)"""
+    url = f"{API_URL}/{pdf_id}.mmd"
+    await throttle_async()
+    async with session.get(url) as r:
+        if r.status != 200:
+            raise MathpixHTTPError(r.status, f"mmd download failed: {r.status}")
+        return await r.text(encoding="utf-8")
+
+async def process_single_page_async(session, page_idx: int, pdf_bytes: bytes,
+                                    cache: Optional[OcrCache] = None,
+                                    poller: Optional[AdaptivePoller] = None,
+                                    manifest: Optional[PageManifest] = None) -> Tuple[int, str]:
+    """단일 페이지 처리 (비동기 모드용, process_single_page와 같은 흐름)"""
+    page_no = page_idx + 1
+
+    key = None
+    if cache is not None:
+        key = cache_key(pdf_bytes, OPTIONS_JSON)
+        mmd = await asyncio.to_thread(cache.get, key)
+        if mmd is not None:
+            print(f"[OK] page {page_no} 캐시 적중, 업로드 생략")
+            if manifest is not None:
+                manifest.mark_done(page_idx, mmd)
+            return page_idx, mmd
+
+    prev_pdf_id = manifest.entry(page_idx).get("pdf_id") if manifest is not None else None
+    if prev_pdf_id:
+        try:
+            print(f"[*] page {page_no} 이전 업로드 재사용 (pdf_id={prev_pdf_id})")
+            polls = await poll_until_done_async(session, prev_pdf_id, poller=poller, page_size=len(pdf_bytes))
+            mmd = await download_mmd_async(session, prev_pdf_id)
+            if cache is not None:
+                await asyncio.to_thread(cache.put, key, mmd)
+            manifest.mark_done(page_idx, mmd)
+            print(f"[OK] page {page_no} 완료! (상태 조회 {polls}회)")
+            return page_idx, mmd
+        except Exception as e:
+            print(f"[*] page {page_no} 이전 업로드 재사용 실패, 다시 업로드: {e}")
+
+    print(f"[*] page {page_no} 업로드 시작...")
+    try:
+        pdf_id = await mathpix_upload_and_get_id_async(session, pdf_bytes)
+        print(f"[*] page {page_no} 업로드 완료 (pdf_id={pdf_id})")
+        if manifest is not None:
+            manifest.mark_uploaded(page_idx, pdf_id)
+
+        print(f"[*] page {page_no} 변환 대기 중...")
+        polls = await poll_until_done_async(session, pdf_id, poller=poller, page_size=len(pdf_bytes))
+
+        print(f"[*] page {page_no} mmd 다운로드 중...")
+        mmd = await download_mmd_async(session, pdf_id)
+        if cache is not None:
+            await asyncio.to_thread(cache.put, key, mmd)
+        if manifest is not None:
+            manifest.mark_done(page_idx, mmd)
+
+        print(f"[OK] page {page_no} 완료! (상태 조회 {polls}회)")
+        return page_idx, mmd
+
+    except Exception as e:
+        print(f"[ERROR] page {page_no} 실패: {e}")
+        if manifest is not None:
+            manifest.mark_failed(page_idx, e)
+        raise
+
+async def process_pages_async(reader: PdfReader, headers: dict, concurrency: int = 32,
+                              cache: Optional[OcrCache] = None,
+                              poller: Optional[AdaptivePoller] = None,
+                              manifest: Optional[PageManifest] = None,
+                              stream: Optional[PageStreamWriter] = None,
+                              stop_run: int = 0,
+                              duplicates: Optional[Dict[int, List[int]]] = None) -> List[Tuple[int, str]]:
+    """페이지들을 코루틴으로 처리 (--async)
+
+    업로드/폴링/다운로드가 하나의 aiohttp 세션(keep-alive 커넥션 풀)을 공유하므로
+    요청마다 TLS 핸드셰이크를 다시 하지 않는다. 동시에 처리하는 페이지 수는
+    concurrency로 제한하고, 페이지 바이트는 크기 concurrency * 2의 큐로 지연 공급한다.
+    실패/재개/조기 중단 처리는 process_pages_parallel과 같다.
+    """
+    import aiohttp
+
+    results = restore_done_pages(manifest, stream, duplicates)
+    skip = pages_to_skip(manifest, results, duplicates)
+    num_pages = len(reader.pages) - len(skip)
+    detector = SolutionRunDetector(stop_run)
+    for page_idx, mmd in sorted(results):
+        detector.feed(page_idx, mmd)
+    cancelled = []
+    print(f"[*] {num_pages}개 페이지를 비동기로 처리 (동시 {concurrency}개)...")
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    failed = []
+    completed_count = 0
+    start_time = time.time()
+
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=60)
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout) as session:
+
+        async def producer():
+            # 페이지 분리(pypdf 직렬화, 리소스 정리)는 CPU/블로킹 작업이라 스레드에서 하나씩 만든다
+            pages = iter_single_pages(reader, skip)
+            while (item := await asyncio.to_thread(next, pages, None)) is not None:
+                if detector.beyond(item[0]):
+                    cancelled.append(item[0])
+                    continue
+                await queue.put(item)
+            for _ in range(concurrency):
+                await queue.put(None)
+
+        async def worker():
+            nonlocal completed_count
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                page_idx, pdf_bytes = item
+                if detector.beyond(page_idx):
+                    cancelled.append(page_idx)
+                    continue
+                try:
+                    async with fair_slot_async():
+                        result = await process_single_page_async(session, page_idx, pdf_bytes, cache, poller,
+                                                                 manifest)
+                except Exception as e:
+                    print(f"[ERROR] 페이지 {page_idx + 1} 처리 실패: {e}")
+                    if manifest is None:
+                        raise
+                    failed.append(page_idx)
+                    continue
+                record_result(result, results, duplicates, manifest, stream)
+                completed_count += 1
+                detector.feed(*result)
+                print_progress(completed_count, num_pages - len(cancelled), start_time)
+
+        tasks = [asyncio.create_task(producer())]
+        tasks += [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            await asyncio.gather(*tasks)
+        except Exception:
+            for t in tasks:
+                t.cancel()
+            raise
+
+    mark_cancelled(cancelled, manifest, stream, duplicates)
+    raise_if_failed(failed)
+
+    # 페이지 순서대로 정렬
+    results.sort(key=lambda x: x[0])
+    return results
+
+# ----------------- 웹훅 완료 모드 -----------------
+WEBHOOK_FALLBACK_SECONDS = 120  # 이 시간 안에 콜백이 안 오면 상태 조회로 직접 확인
+WEBHOOK_CALLBACK_OPTION = "callback"  # Mathpix options_json에 콜백 URL을 넣는 키
+# 아직 콜백을 하나도 못 받았을 때의 시한: 예상 처리 시간의 3배 (최소 15초, 최대 위 시한)
+# 이 안에 첫 콜백이 안 오면 콜백이 동작하지 않는 것으로 보고 상태 조회로 전환한다.
+WEBHOOK_PROBE_FACTOR = 3
+WEBHOOK_PROBE_MIN_SECONDS = 15
+
+def webhook_options_json(callback_url: str) -> str:
+    options = dict(MATHPIX_OPTIONS)
+    options[WEBHOOK_CALLBACK_OPTION] = {"post": callback_url}
+    return json.dumps(options, sort_keys=True)
+
+def upload_for_webhook(page_idx: int, pdf_bytes: bytes, headers: dict, receiver: CompletionReceiver,
+                       cache: Optional[OcrCache] = None,
+                       manifest: Optional[PageManifest] = None) -> Tuple[int, Optional[str], Optional[str], Optional[str]]:
+    """캐시 확인 후 콜백 URL을 붙여 업로드만 하고 바로 반환
+
+    반환: (page_idx, pdf_id, cache_key, mmd) - 캐시 적중이면 pdf_id 없이 mmd만 채운다.
+    """
+    page_no = page_idx + 1
+    key = None
+    if cache is not None:
+        key = cache_key(pdf_bytes, OPTIONS_JSON)
+        mmd = cache.get(key)
+        if mmd is not None:
+            print(f"[OK] page {page_no} 캐시 적중, 업로드 생략")
+            if manifest is not None:
+                manifest.mark_done(page_idx, mmd)
+            return page_idx, None, key, mmd
+
+    # 슬롯은 업로드하는 동안만 잡는다. 콜백을 기다리는 동안 들고 있으면, 같은 스레드 풀에
+    # 줄 선 업로드들이 슬롯을 기다리느라 슬롯을 돌려줄 다운로드가 실행되지 못한다.
+    fair_acquire()
+    try:
+        pdf_id = mathpix_upload_and_get_id(pdf_bytes, headers, webhook_options_json(receiver.callback_url(page_idx)))
+    except Exception as e:
+        print(f"[ERROR] page {page_no} 업로드 실패: {e}")
+        if manifest is not None:
+            manifest.mark_failed(page_idx, e)
+        raise
+    finally:
+        fair_release(done=False)
+    print(f"[*] page {page_no} 업로드 완료 (pdf_id={pdf_id}), 완료 콜백 대기")
+    if manifest is not None:
+        manifest.mark_uploaded(page_idx, pdf_id)
+    return page_idx, pdf_id, key, None
+
+def download_for_webhook(page_idx: int, pdf_id: str, headers: dict, key: Optional[str],
+                         cache: Optional[OcrCache] = None, manifest: Optional[PageManifest] = None,
+                         poll_first: bool = False, poller: Optional[AdaptivePoller] = None,
+                         page_size: int = 0) -> Tuple[int, str]:
+    """완료된 페이지 mmd 다운로드 (poll_first면 콜백이 안 와서 상태 조회로 먼저 확인)
+
+    공용 슬롯은 다운로드(와 상태 조회)하는 동안 다시 받는다.
+    """
+    page_no = page_idx + 1
+    ok = False
+    fair_acquire()
+    try:
+        if poll_first:
+            poll_until_done(pdf_id, headers, poller=poller, page_size=page_size)
+        mmd = download_mmd(pdf_id, headers)
+        if cache is not None and key is not None:
+            cache.put(key, mmd)
+        if manifest is not None:
+            manifest.mark_done(page_idx, mmd)
+        ok = True
+        print(f"[OK] page {page_no} 완료!")
+        return page_idx, mmd
+    except Exception as e:
+        print(f"[ERROR] page {page_no} 실패: {e}")
+        if manifest is not None:
+            manifest.mark_failed(page_idx, e)
+        raise
+    finally:
+        fair_release(done=ok)
+
+def process_pages_webhook(reader: PdfReader, headers: dict, receiver: CompletionReceiver,
+                          max_workers: int = 8, max_outstanding: int = 64,
+                          cache: Optional[OcrCache] = None,
+                          manifest: Optional[PageManifest] = None,
+                          stream: Optional[PageStreamWriter] = None,
+                          duplicates: Optional[Dict[int, List[int]]] = None,
+                          poller: Optional[AdaptivePoller] = None) -> List[Tuple[int, str]]:
+    """업로드 후 완료 콜백으로 페이지를 끝내는 모드 (--webhook-url)
+
+    워커 스레드는 업로드와 다운로드만 하고 바로 돌아오므로, 변환 중인 페이지 수(max_outstanding)가
+    스레드 수에 묶이지 않는다. 콜백이 WEBHOOK_FALLBACK_SECONDS 안에 오지 않은 페이지는
+    상태 조회로 직접 확인한다. 첫 콜백이 오기 전에는 poller의 예상 처리 시간으로 더 짧은 시한을
+    두고, 그 안에 콜백이 하나도 안 오면 경고를 남기고 남은 페이지 전부를 상태 조회로 처리한다.
+    실패/재개/중복 페이지 처리는 process_pages_parallel과 같다.
+    """
+    results = restore_done_pages(manifest, stream, duplicates)
+    skip = pages_to_skip(manifest, results, duplicates)
+    num_pages = len(reader.pages) - len(skip)
+    print(f"[*] {num_pages}개 페이지를 웹훅 완료 모드로 처리 (스레드 {max_workers}개, 동시 변환 최대 {max_outstanding}페이지)...")
+
+    pages = iter_single_pages(reader, skip)
+    failed = []
+    waiting = {}  # page_idx -> (pdf_id, cache_key, 업로드 시각)
+    arrived = {}  # 업로드 결과보다 먼저 도착한 콜백
+    sizes = {}    # page_idx -> 업로드 바이트 수 (예상 처리 시간/폴링 학습용)
+    callbacks_seen = False  # 콜백을 하나라도 받았는지
+    polling = False         # 콜백이 동작하지 않아 상태 조회로 전환했는지
+    completed_count = 0
+    start_time = time.time()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+
+        def submit_next() -> bool:
             try:
-                result = future.result()
-                results.append(result)
+                page_idx, pdf_bytes = next(pages)
+            except StopIteration:
+                return False
+            sizes[page_idx] = len(pdf_bytes)
+            futures[executor.submit(upload_for_webhook, page_idx, pdf_bytes, headers, receiver,
+                                    cache, manifest)] = page_idx
+            return True
+
+        def submit_download(page_idx: int, poll_first: bool = False):
+            pdf_id, key, _ = waiting.pop(page_idx)
+            futures[executor.submit(download_for_webhook, page_idx, pdf_id, headers, key,
+                                    cache, manifest, poll_first, poller, sizes.get(page_idx, 0))] = page_idx
+
+        def callback_deadline(page_idx: int) -> float:
+            if callbacks_seen:
+                return WEBHOOK_FALLBACK_SECONDS
+            expected = poller.expected(sizes.get(page_idx, 0)) if poller is not None else 0.0
+            return min(WEBHOOK_FALLBACK_SECONDS, max(WEBHOOK_PROBE_MIN_SECONDS, WEBHOOK_PROBE_FACTOR * expected))
+
+        def on_callback(page_idx: int, payload: dict):
+            if payload.get("status") in ("error", "failed"):
+                waiting.pop(page_idx)
+                print(f"[ERROR] page {page_idx + 1} 변환 실패 콜백: {payload}")
+                if manifest is not None:
+                    manifest.mark_failed(page_idx, f"Processing error: {payload}")
+                failed.append(page_idx)
+            else:
+                submit_download(page_idx)
+
+        while len(futures) + len(waiting) < max_outstanding and submit_next():
+            pass
+
+        while futures or waiting:
+            if futures:
+                done, _ = concurrent.futures.wait(futures, timeout=0.2,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+            else:
+                done = set()
+            events = receiver.drain(timeout=0 if futures else 0.2)
+
+            for future in done:
+                page_idx = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception:
+                    if manifest is None:
+                        for pending in futures:
+                            pending.cancel()
+                        raise
+                    failed.append(page_idx)
+                    continue
+                if len(result) == 4:  # 업로드 결과
+                    _, pdf_id, key, mmd = result
+                    if mmd is None:
+                        waiting[page_idx] = (pdf_id, key, time.time())
+                        if polling:
+                            submit_download(page_idx, poll_first=True)
+                        elif page_idx in arrived:
+                            on_callback(page_idx, arrived.pop(page_idx))
+                        continue
+                    result = (page_idx, mmd)
+                record_result(result, results, duplicates, manifest, stream)
                 completed_count += 1
+                print_progress(completed_count, num_pages, start_time)
 
-                # 진행상황 및 예상 시간 출력 (1페이지마다)
-                elapsed_time = time.time() - start_time
-                avg_time_per_page = elapsed_time / completed_count
-                remaining_pages = total_pages - completed_count
-                estimated_remaining_time = avg_time_per_page * remaining_pages
+            if events:
+                callbacks_seen = True
+            for page_idx, payload in events:
+                if page_idx in waiting:
+                    on_callback(page_idx, payload)
+                elif page_idx in futures.values():
+                    arrived[page_idx] = payload  # 업로드 응답보다 콜백이 먼저 옴
 
-                percentage = int((completed_count / total_pages) * 100)
-                print(f"[PDF진행] {completed_count}/{total_pages} 페이지 ({percentage}%) - 예상 남은 시간: {int(estimated_remaining_time)}초")
+            now = time.time()
+            overdue = [i for i, (_, _, t) in waiting.items() if now - t > callback_deadline(i)]
+            if overdue and not callbacks_seen and not polling:
+                polling = True
+                print(f"[WARN] page {overdue[0] + 1} 업로드 후 {callback_deadline(overdue[0]):.0f}초 동안 완료 콜백이 "
+                      f"하나도 오지 않았습니다. Mathpix가 '{WEBHOOK_CALLBACK_OPTION}' 옵션을 쓰지 않거나 "
+                      f"{receiver.public_url}에 닿지 못하는 것으로 보고 남은 페이지는 상태 조회로 처리합니다.")
+                overdue = list(waiting)
+            for page_idx in overdue:
+                if not polling:
+                    print(f"[*] page {page_idx + 1} 콜백 없음 ({WEBHOOK_FALLBACK_SECONDS}초), 상태 조회로 확인")
+                submit_download(page_idx, poll_first=True)
+
+            while len(futures) + len(waiting) < max_outstanding and submit_next():
+                pass
+
+    raise_if_failed(failed)
 
-            except Exception as e:
-                print(f"[ERROR] 페이지 {page_idx + 1} 처리 실패: {e}")
-                raise
-    
     # 페이지 순서대로 정렬
     results.sort(key=lambda x: x[0])
     return results
@@ -210,8 +1205,77 @@ def main():
     parser.add_argument("--pdf", type=str, help="변환할 PDF 파일 경로 (서버 모드)")
     parser.add_argument("--sample", type=str, help="history 폴더의 샘플 번호 (테스트 모드)")
     parser.add_argument("--workers", type=int, default=8, help="병렬 처리 워커 수 (기본값: 8)")
+    parser.add_argument("--auto-workers", action="store_true", default=os.getenv("AUTO_WORKERS") == "1",
+                        help="--workers에서 시작해 지연/429·5xx 비율을 보고 동시 처리 수를 자동 조절 (AIMD, env AUTO_WORKERS=1)")
+    parser.add_argument("--max-workers", type=int, default=32,
+                        help="--auto-workers로 늘릴 수 있는 최대 동시 처리 수 (기본값: 32)")
+    add_job_args(parser)
+    parser.add_argument("--pages", type=str,
+                        help='변환할 페이지 범위 (예: "1-10,15,20-", 기본값: 전체)')
+    parser.add_argument("--priority-pages", type=int, default=0, metavar="N",
+                        help="선택된 페이지 중 앞쪽 N페이지를 먼저 처리하고, 끝나는 즉시 결과 파일을 먼저 저장 (기본값: 0=사용 안 함)")
+    parser.add_argument("--resume", action="store_true",
+                        help="이전 실행의 체크포인트(매니페스트)를 이어받아 미완료/실패 페이지만 처리")
+    parser.add_argument("--triage", action="store_true",
+                        help="PDF 텍스트 레이어로 해설/정답표 페이지를 미리 판정해 OCR 생략")
+    parser.add_argument("--dedup", action="store_true",
+                        help="빈 페이지는 OCR 생략, 같은 페이지는 한 번만 OCR해서 결과 복사 (거의 같은 페이지는 --dedup-near)")
+    parser.add_argument("--dedup-near", type=int, default=NEAR_MAX_DISTANCE, metavar="BITS",
+                        help=f"유사 중복으로 볼 지각 해시 최대 거리 (기본값: {NEAR_MAX_DISTANCE}=동일 페이지만, "
+                             f"다시 스캔된 페이지까지 잡으려면 {NEAR_SUGGESTED_DISTANCE} 정도)")
+    parser.add_argument("--stop-after-solution-run", type=int, default=0, metavar="N",
+                        help="해설 판정 페이지가 N개 연속으로 나오면 그 뒤 대기 중인 페이지 OCR 취소 (기본값: 0=사용 안 함)")
+    parser.add_argument("--hedge-budget", type=float, default=0.0, metavar="RATIO",
+                        help="처리 시간이 p90을 넘는 페이지에 중복 업로드를 보낼 최대 페이지 비율 "
+                             "(예: 0.1=실제로 OCR 요청을 보낸 페이지의 10%%, 기본값: 0=사용 안 함, 스레드 모드 전용)")
+    parser.add_argument("--stream", action="store_true",
+                        help=f"완료된 페이지를 즉시 {STREAM_NAME}에 덧붙임 (filter_pages.py --follow로 바로 소비)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="aiohttp 비동기 모드로 처리 (커넥션 풀 공유, 스레드 대신 코루틴)")
+    parser.add_argument("--webhook-url", type=str, default=os.getenv("MATHPIX_WEBHOOK_URL"),
+                        help="완료 콜백을 받을 공개 URL (지정하면 상태 조회 대신 콜백으로 완료 처리, env MATHPIX_WEBHOOK_URL)")
+    parser.add_argument("--webhook-port", type=int, default=int(os.getenv("MATHPIX_WEBHOOK_PORT", WEBHOOK_PORT)),
+                        help=f"콜백 수신 로컬 포트 (기본값: {WEBHOOK_PORT}, 0=빈 포트 자동 선택)")
+    parser.add_argument("--webhook-outstanding", type=int, default=64,
+                        help="웹훅 모드에서 동시에 변환 중일 수 있는 최대 페이지 수 (기본값: 64)")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="비동기 모드 동시 처리 페이지 수 (기본값: 32)")
+    parser.add_argument("--cache-dir", type=str, default=os.getenv("OCR_CACHE_DIR", DEFAULT_CACHE_DIR),
+                        help=f"OCR 결과 캐시 폴더 (기본값: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="OCR 캐시 최대 크기(MB), 넘으면 오래된 항목부터 삭제 (기본값: 512)")
+    parser.add_argument("--no-cache", action="store_true", help="OCR 캐시 사용 안 함")
+    parser.add_argument("--rate-limit", type=float,
+                        default=float(os.getenv("MATHPIX_RATE", DEFAULT_RATE)),
+                        help=f"모든 변환 프로세스 합산 Mathpix 초당 요청 수 (기본값: {DEFAULT_RATE:g}, 0=제한 없음)")
+    parser.add_argument("--rate-burst", type=float,
+                        default=float(os.getenv("MATHPIX_BURST", DEFAULT_BURST)),
+                        help=f"토큰 버킷 최대 버스트 (기본값: {DEFAULT_BURST})")
+    parser.add_argument("--rate-backend", choices=("file", "mongo", "none"),
+                        default=os.getenv("MATHPIX_RATE_BACKEND", "file"),
+                        help="토큰 버킷 공유 방식: file=호스트 공용 잠금 파일, mongo=여러 서버 공유 (기본값: file)")
+    parser.add_argument("--optimize-payload", action="store_true",
+                        help="업로드 전 페이지 PDF에서 쓰지 않는 리소스 제거 + 내용 스트림 재압축")
+    parser.add_argument("--max-image-dpi", type=int, default=0,
+                        help="--optimize-payload 때 이 DPI보다 큰 이미지는 다운샘플링 (기본값: 0=안 함, Pillow 필요)")
+    parser.add_argument("--jpeg-quality", type=int, default=DEFAULT_JPEG_QUALITY,
+                        help=f"다운샘플링한 이미지 JPEG 품질 (기본값: {DEFAULT_JPEG_QUALITY})")
+    parser.add_argument("--fair-share", action="store_true", default=os.getenv("FAIR_SHARE") == "1",
+                        help="호스트의 모든 작업이 Mathpix 동시 처리 슬롯을 사용자별로 공정하게 나눠 씀 (env FAIR_SHARE=1)")
+    parser.add_argument("--user-id", type=str, default=os.getenv("USER_ID", "anonymous"),
+                        help="공정 분배 기준 사용자 ID (기본값: env USER_ID 또는 anonymous)")
+    parser.add_argument("--share-weight", type=float, default=1.0,
+                        help="공정 분배 가중치 (기본값: 1, 2면 다른 사용자의 두 배 슬롯)")
+    parser.add_argument("--share-capacity", type=int,
+                        default=int(os.getenv("MATHPIX_CONCURRENCY", DEFAULT_CAPACITY["mathpix"])),
+                        help=f"호스트 전체 Mathpix 동시 처리 페이지 수 (기본값: {DEFAULT_CAPACITY['mathpix']})")
+    parser.add_argument("--poll-stats", type=str, default=DEFAULT_STATS_PATH,
+                        help=f"페이지 크기별 처리 시간 학습 파일 (기본값: {DEFAULT_STATS_PATH})")
+    parser.add_argument("--fixed-poll", action="store_true",
+                        help="적응형 폴링 대신 2초 고정 간격으로 상태 조회")
 
     args = parser.parse_args()
+    job_dir = resolve_job_dir(args, create=True)
 
     # 모드 결정
     if args.pdf:
@@ -256,39 +1320,179 @@ def main():
     reader = PdfReader(str(pdf_path))
     num_pages = len(reader.pages)
     print(f"[*] 입력: {pdf_path.name}  총 {num_pages}p")
-    print(f"[*] 병렬 처리: {args.workers}개 스레드")
+    if args.use_async:
+        print(f"[*] 비동기 처리: 동시 {args.concurrency}개")
+    elif args.auto_workers and not args.webhook_url:
+        print(f"[*] 병렬 처리: {args.workers}개 스레드에서 시작, 최대 {args.max_workers}개까지 자동 조절")
+    else:
+        print(f"[*] 병렬 처리: {args.workers}개 스레드")
 
-    start_time = time.time()
+    cache = None
+    if not args.no_cache:
+        cache = OcrCache(Path(args.cache_dir), args.cache_max_mb * 1024 * 1024)
 
-    # 병렬 처리로 페이지들 변환
-    results = process_pages_parallel(pdf_path, headers, args.workers)
+    # 웹훅 모드에서는 첫 콜백 시한을 정하고, 콜백이 안 와서 상태 조회로 전환했을 때 씀
+    poller = None if args.fixed_poll else AdaptivePoller(Path(args.poll_stats))
 
-    # 결과 합치기
-    combined = []
-    for page_idx, mmd in results:
-        page_no = page_idx + 1
-        combined.append(f"<<<PAGE {page_no}>>>")
-        combined.append(mmd)
+    global RATE_LIMITER
+    RATE_LIMITER = make_rate_limiter(args.rate_backend, args.rate_limit, args.rate_burst)
+
+    global PAYLOAD_OPTIMIZER
+    if args.optimize_payload:
+        PAYLOAD_OPTIMIZER = PayloadOptimizer(args.max_image_dpi, args.jpeg_quality)
 
     # 출력 파일 경로 결정
     if sample_path:
         # 테스트/대화형 모드: 샘플 폴더에 저장
         output_file = sample_path / "result.paged.mmd"
+    elif job_dir:
+        # 서버 모드(작업 폴더): 작업별 폴더에 저장하고 오래된 작업 폴더 정리
+        output_file = job_dir / "result.paged.mmd"
+        for old in cleanup_jobs(keep=job_dir):
+            print(f"[*] 오래된 작업 폴더 삭제: {old}")
     else:
         # 서버 모드: output 폴더에 저장
         output_dir = Path("output")
         output_dir.mkdir(exist_ok=True)
         output_file = output_dir / "result.paged.mmd"
 
-    # 저장
-    output_file.write_text("\n".join(combined), encoding="utf-8")
+    # 페이지별 체크포인트 (--resume이면 이전 상태 이어받기)
+    manifest = PageManifest.for_output(output_file, pdf_path, num_pages, args.resume)
+
+    # --resume에서 --pages를 다시 주지 않으면 이전 실행의 페이지 범위를 그대로 쓴다
+    not_selected = set(manifest.not_selected_pages())
+    selected = [page_idx for page_idx in range(num_pages) if page_idx not in not_selected]
+    if args.pages:
+        try:
+            selected = parse_page_ranges(args.pages, num_pages)
+        except ValueError as e:
+            die(str(e))
+        keep = set(selected) | set(manifest.done_pages())
+        for page_idx in range(num_pages):
+            if page_idx not in keep:
+                manifest.mark_skipped(page_idx, NOT_SELECTED)
+            elif page_idx in not_selected:
+                manifest.mark_pending(page_idx)
+        print(f"[*] 페이지 범위 {args.pages}: {len(selected)}/{num_pages}페이지 변환")
+    elif not_selected:
+        print(f"[*] 이전 실행의 페이지 범위 유지: {len(selected)}/{num_pages}페이지 변환")
+
+    triaged = triage_pages(reader, manifest) if args.triage else 0
+    duplicates, deduped = dedup_pages(reader, pdf_path, manifest, args.dedup_near) if args.dedup else ({}, 0)
+
+    # 완료 순서대로 페이지를 덧붙이는 스트림 (--stream)
+    stream = None
+    if args.stream:
+        stream = PageStreamWriter(output_file.with_name(STREAM_NAME), num_pages, pdf_path.name)
+        print(f"[*] 페이지 스트림: {stream.path}")
+
+    global PREVIEW
+    if args.priority_pages > 0:
+        PREVIEW = PriorityPreview(selected[:args.priority_pages], output_file)
+        # 건너뛰는 페이지(--triage/--dedup 등)는 기다리지 않음
+        PREVIEW.pending -= set(manifest.skipped_pages())
+        print(f"[*] 우선 처리: 앞쪽 {len(PREVIEW.pending)}페이지")
+
+    global SCHEDULER
+    if args.fair_share:
+        pending = num_pages - len(manifest.done_pages()) - len(manifest.skipped_pages())
+        pending -= sum(len(d) for d in duplicates.values())
+        SCHEDULER = FairShareScheduler("mathpix", args.user_id, job_name(args), pending,
+                                       args.share_weight, args.share_capacity)
+        print(f"[FAIR] 사용자 {args.user_id} 작업 {SCHEDULER.job}: {pending}페이지, 전체 한도 {args.share_capacity}")
+
+    global LIMITER
+    workers = args.workers
+    if args.auto_workers:
+        if args.use_async or args.webhook_url:
+            print("[AIMD] --auto-workers는 스레드 모드 전용이라 --async/--webhook-url에서는 무시합니다")
+        else:
+            LIMITER = AimdLimiter("mathpix", args.workers, max_limit=max(args.workers, args.max_workers))
+            workers = LIMITER.max_limit
+
+    hedger = None
+    if args.hedge_budget > 0:
+        if args.use_async or args.webhook_url:
+            print("[HEDGE] --hedge-budget은 스레드 모드 전용이라 --async/--webhook-url에서는 무시합니다")
+        else:
+            hedger = Hedger(args.hedge_budget)
+
+    start_time = time.time()
+
+    receiver = None
+    if args.webhook_url:
+        try:
+            receiver = CompletionReceiver(args.webhook_url, port=args.webhook_port)
+        except OSError as e:
+            die(f"완료 콜백 수신 포트 {args.webhook_port}를 열 수 없습니다: {e} "
+                f"(--webhook-port/MATHPIX_WEBHOOK_PORT를 바꾸거나 --webhook-url 없이 상태 조회로 실행하세요)")
+        if receiver.serving:
+            print(f"[WEBHOOK] 완료 콜백 수신 대기: 포트 {receiver.port} → {args.webhook_url}")
+        else:
+            print(f"[WEBHOOK] 포트 {receiver.port}는 다른 변환 작업의 수신 서버가 쓰고 있어 같이 사용합니다 "
+                  f"(스풀: {receiver.spool}) → {args.webhook_url}")
+        if args.use_async or args.stop_after_solution_run:
+            print("[WEBHOOK] 웹훅 모드에서는 --async/--stop-after-solution-run을 쓰지 않습니다")
+
+    # 병렬 처리로 페이지들 변환
+    try:
+        if receiver is not None:
+            results = process_pages_webhook(reader, headers, receiver, args.workers, args.webhook_outstanding,
+                                            cache, manifest, stream, duplicates, poller)
+        elif args.use_async:
+            results = asyncio.run(process_pages_async(reader, headers, args.concurrency, cache, poller,
+                                                      manifest, stream, args.stop_after_solution_run,
+                                                      duplicates))
+        else:
+            results = process_pages_parallel(reader, headers, workers, cache, poller, manifest, stream,
+                                             args.stop_after_solution_run, duplicates, hedger)
+    except Exception as e:
+        if stream is not None:
+            stream.close(error=e)
+        die(f"{e} (체크포인트: {manifest.path})")
+    finally:
+        if poller is not None:
+            poller.save()
+        if SCHEDULER is not None:
+            SCHEDULER.close()
+        if receiver is not None:
+            receiver.close()
+
+    # 결과 합쳐서 저장
+    write_combined(output_file, results)
+    if stream is not None:
+        stream.close()
 
     end_time = time.time()
     duration = end_time - start_time
 
     print(f"[OK] {output_file} 생성 완료!")
     print(f"[OK] 총 소요 시간: {duration:.2f}초")
-    print(f"[OK] 평균 페이지당: {duration/num_pages:.2f}초")
+    print(f"[OK] 평균 페이지당: {duration/len(selected):.2f}초")
+    if triaged:
+        ocr_pages = max(1, len(results))
+        print(f"[TRIAGE] {triaged}/{num_pages}페이지 OCR 생략 "
+              f"(OCR 페이지당 {duration/ocr_pages:.2f}초 기준 약 {duration/ocr_pages*triaged:.0f}초 절약)")
+    if deduped:
+        ocr_pages = max(1, len(results) - sum(len(d) for d in duplicates.values()))
+        print(f"[DEDUP] {deduped}/{num_pages}페이지 OCR 생략 "
+              f"(OCR 페이지당 {duration/ocr_pages:.2f}초 기준 약 {duration/ocr_pages*deduped:.0f}초 절약)")
+    if cache is not None:
+        print(f"[CACHE] {cache.summary()}")
+    if poller is not None:
+        print(f"[POLL] {poller.summary()}")
+    if RATE_LIMITER is not None:
+        print(f"[RATE] {RATE_LIMITER.summary()}")
+    if hedger is not None:
+        print(f"[HEDGE] {hedger.summary()}")
+    if receiver is not None:
+        print(f"[WEBHOOK] {receiver.summary()}")
+    if SCHEDULER is not None:
+        print(f"[FAIR] {SCHEDULER.summary()}")
+    if PAYLOAD_OPTIMIZER is not None:
+        print(f"[PAYLOAD] {PAYLOAD_OPTIMIZER.summary()}")
+    if LIMITER is not None:
+        print(f"[AIMD] {LIMITER.summary()}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+fair_share.py - 여러 작업(job)이 함께 쓰는 OCR/LLM 동시 처리 슬롯의 사용자별 공정 분배
+app.cjs가 업로드마다 단계별 프로세스를 따로 띄우고 각자 스레드 풀을 잡기 때문에,
+400페이지 책 하나가 돌면 다른 사용자의 4페이지 퀴즈가 그 뒤에서 기다리게 된다.
+
+풀(pool, 예: mathpix / llm)마다 호스트 공용 상태 파일에 전체 동시 처리 한도(capacity)와
+작업별 실행 중 개수를 두고, 작업은 페이지/문제 하나를 처리하기 전에 슬롯을 받는다.
+  - 빈 슬롯이 나면 지금 기다리는 작업 중 아래 순서로 가장 앞선 작업이 가져간다
+    1) 남은 작업이 SMALL_JOB_TASKS개 이하인 작은 작업 우선
+    2) 사용자별 (실행 중 개수 / 가중치)가 작은 사용자 (가중 라운드 로빈)
+    3) 같은 사용자 안에서는 실행 중 개수, 남은 작업 수가 적은 작업
+  - 기다리는 다른 작업이 없으면 한도 안에서 얼마든지 가져간다 (놀리는 슬롯 없음)
+  - 프로세스가 죽어 STALE_SECONDS 동안 소식이 없는 작업은 슬롯을 회수한다
+"""
+
+import os
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+from rate_limit import _FileLock
+
+DEFAULT_CAPACITY = {"mathpix": 16, "llm": 60}
+SMALL_JOB_TASKS = 8       # 남은 작업이 이 이하면 작은 작업으로 우선 처리
+WAIT_POLL = 0.1           # 슬롯을 못 받았을 때 다시 시도하는 간격(초)
+WAIT_FRESH = 0.5          # 이 시간 안에 슬롯을 요청한 작업만 '기다리는 중'으로 본다
+STALE_SECONDS = 600       # 이 시간 동안 갱신이 없는 작업은 죽은 것으로 보고 제거
+
+
+def default_state_path(pool: str) -> Path:
+    root = Path(os.getenv("FAIR_SHARE_DIR", tempfile.gettempdir()))
+    return root / f"fair_share_{pool}.json"
+
+
+class FairShareScheduler:
+    """한 작업이 풀의 슬롯을 받고 돌려주는 클라이언트 (스레드 안전)
+
+    with scheduler.slot():     # 스레드 워커
+        ...
+    async with scheduler.slot_async():   # 코루틴 워커
+        ...
+    """
+
+    def __init__(self, pool: str, user: str, job: str, total_tasks: int, weight: float = 1.0,
+                 capacity: int = 0, path: Path = None):
+        self.pool = pool
+        self.user = user
+        self.job = job
+        self.weight = max(weight, 0.01)
+        self.capacity = capacity or DEFAULT_CAPACITY.get(pool, 16)
+        self.path = Path(path) if path else default_state_path(pool)
+        self.lock_path = self.path.with_suffix(self.path.suffix + ".lock")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.waited = 0.0
+        self.granted = 0
+        self._stats_lock = threading.Lock()
+        with self._locked() as state:
+            state["jobs"][self.job] = {
+                "user": self.user, "weight": self.weight, "remaining": total_tasks,
+                "running": 0, "want": 0.0, "seen": time.time(),
+            }
+
+    @contextmanager
+    def _locked(self):
+        """상태 파일을 잠근 채로 읽고, 블록이 끝나면 저장"""
+        with _FileLock(self.lock_path):
+            try:
+                state = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                state = {}
+            state.setdefault("jobs", {})
+            state["capacity"] = self.capacity
+            now = time.time()
+            for job, entry in list(state["jobs"].items()):
+                if now - entry.get("seen", 0) > STALE_SECONDS:
+                    del state["jobs"][job]
+            yield state
+            self.path.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+
+    def _own(self, state: dict) -> dict:
+        # 오래 쉬어서 다른 프로세스가 지웠으면 다시 등록
+        return state["jobs"].setdefault(self.job, {
+            "user": self.user, "weight": self.weight, "remaining": 1,
+            "running": 0, "want": 0.0, "seen": time.time(),
+        })
+
+    @staticmethod
+    def _priority(job: str, entry: dict, users: dict) -> tuple:
+        user = users[entry["user"]]
+        small = entry["remaining"] <= SMALL_JOB_TASKS
+        return (0 if small else 1, user["running"] / user["weight"], entry["running"], entry["remaining"], job)
+
+    def try_acquire(self) -> bool:
+        with self._locked() as state:
+            now = time.time()
+            own = self._own(state)
+            own["seen"] = now
+            own["want"] = now
+            jobs = state["jobs"]
+            if sum(e["running"] for e in jobs.values()) >= self.capacity:
+                return False
+
+            waiting = {job: e for job, e in jobs.items() if now - e.get("want", 0) <= WAIT_FRESH}
+            users = {}
+            for e in jobs.values():
+                u = users.setdefault(e["user"], {"running": 0, "weight": 0.0})
+                u["running"] += e["running"]
+                u["weight"] = max(u["weight"], e.get("weight", 1.0))
+            best = min(waiting, key=lambda job: self._priority(job, waiting[job], users))
+            if best != self.job:
+                return False
+            own["running"] += 1
+            return True
+
+    def release(self, done: bool = True):
+        with self._locked() as state:
+            own = self._own(state)
+            own["running"] = max(0, own["running"] - 1)
+            if done:
+                own["remaining"] = max(0, own["remaining"] - 1)
+            own["seen"] = time.time()
+
+    def _count(self, waited: float):
+        with self._stats_lock:
+            self.granted += 1
+            self.waited += waited
+
+    def acquire(self):
+        t0 = time.time()
+        while not self.try_acquire():
+            time.sleep(WAIT_POLL)
+        self._count(time.time() - t0)
+
+    async def acquire_async(self):
+        # 상태 파일 잠금/읽기/쓰기는 블로킹이므로 이벤트 루프 밖에서 실행
+        t0 = time.time()
+        while not await asyncio.to_thread(self.try_acquire):
+            await asyncio.sleep(WAIT_POLL)
+        self._count(time.time() - t0)
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.release(done=ok)
+
+    @asynccontextmanager
+    async def slot_async(self):
+        await self.acquire_async()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            await asyncio.to_thread(self.release, ok)
+
+    def close(self):
+        """작업 종료 - 상태 파일에서 이 작업 제거"""
+        with self._locked() as state:
+            state["jobs"].pop(self.job, None)
+
+    def summary(self) -> str:
+        avg = self.waited / self.granted if self.granted else 0.0
+        return (f"{self.pool} 사용자 {self.user}, 슬롯 {self.granted}회 사용, "
+                f"대기 누적 {self.waited:.1f}초 (평균 {avg:.2f}초, 전체 한도 {self.capacity})")
+
+
+def job_name(args) -> str:
+    """작업 구분 이름: --job-id/--job-dir 이름, 없으면 프로세스 ID"""
+    job_id = getattr(args, "job_id", None)
+    job_dir = getattr(args, "job_dir", None)
+    if job_id:
+        return job_id
+    if job_dir:
+        return Path(job_dir).name
+    return f"pid{os.getpid()}"
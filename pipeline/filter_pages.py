@@ -2,29 +2,21 @@
 # 입력:  result.paged.mmd 또는 result_paged.mmd
 # 출력:  result.paged.filtered.mmd
 from __future__ import annotations
-import re, unicodedata, argparse
-from dataclasses import dataclass
+import os, re, json, time, argparse
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+from job_workspace import add_job_args, resolve_job_dir
+from page_stream import STREAM_NAME
+# 페이지 마크/보이지 않는 문자 제거/정규화는 split.py와 함께 쓰는 line_store에 있음
+from line_store import LineStore, PAGE_MARK_RX, fold, strip_invisible
 
 # ----------------- 공통 정규식 / 전처리 -----------------
-PAGE_MARK_RX = re.compile(r"^<<<PAGE\s+(\d+)\s*>>>$")
 
 HEADING_LINE_RX = re.compile(
     r"""^\s{0,3}(?:\\section\*\{([^}]*)\}|#{1,4}\s*(.+))\s*$"""
 )
 
-INVIS_RX = re.compile(r"[\u200B-\u200F\u202A-\u202E\u2060\u2066-\u2069\uFEFF\u00A0]")
-TRANS = str.maketrans({
-    "（":"(", "）":")", "［":"[", "］":"]", "．":".", "。":".",
-    "【":"[", "】":"]", "「":"[", "」":"]", "｢":"[", "｣":"]"
-})
-def norm(s:str)->str:
-    s = s or ""
-    s = INVIS_RX.sub("", s)
-    s = unicodedata.normalize("NFKC", s)
-    s = s.translate(TRANS)
-    return s.strip()
-
 # ----------------- 새로운 필터링 조건들 (v2에서 복사) -----------------
 
 # 1. 해설 조건: '따라서, ~므로, [반례], ~에 의하여'의 variation
@@ -79,13 +71,22 @@ IMAGE_LINK_RX = re.compile(r'!\[.*?\]\([^)]+\)|\\includegraphics(?:\[[^\]]*\])?\
 SCORE_BRACKET_RX    = re.compile(r'\[\s*\d+(?:\.\d+)?\s*점(?:[^\]]*)\]')
 
 # 답안표/테이블 강 판정
+TABULAR_RX = re.compile(r'\\begin\{tabular\}')
+CHOICE_TOKEN_RX = re.compile(r'\(\s*[1-5]\s*\)')
+LETTER_RX = re.compile(r'[가-힣a-zA-Z]')
+SYMBOL_RUN_RX = re.compile(r'[0-9\(\)\[\]\{\}&\\\\=\+\-\*/\.,]+')
+
 def looks_like_answer_table(page_text:str)->bool:
     t = page_text
-    has_tab = bool(re.search(r'\\begin\{tabular\}', t))
-    choice_tokens = len(re.findall(r'\(\s*[1-5]\s*\)', t))
+    return answer_table_from_counts(t, bool(TABULAR_RX.search(t)), len(CHOICE_TOKEN_RX.findall(t)))
+
+def answer_table_from_counts(t:str, has_tab:bool, choice_tokens:int)->bool:
+    # 아래 세 조건 모두 선택 토큰 6개 이상이 필요 → 그보다 적으면 나머지는 세지 않음
+    if choice_tokens < 6:
+        return False
     amp = t.count('&'); bs = t.count('\\\\')
-    letters = len(re.findall(r'[가-힣a-zA-Z]', t))
-    symbols = len(re.findall(r'[0-9\(\)\[\]\{\}&\\\\=\+\-\*/\.,]+', t))
+    letters = len(LETTER_RX.findall(t))
+    symbols = len(SYMBOL_RUN_RX.findall(t))
     # 강 조건(테이블 + 선택 토큰/구분자 다량 + 본문 적음)
     if has_tab and choice_tokens >= 6 and (amp+bs) >= 6 and letters <= 40:
         return True
@@ -97,18 +98,174 @@ def looks_like_answer_table(page_text:str)->bool:
         return True
     return False
 
+# ----------------- 한 번에 훑는 페이지 스캐너 -----------------
+# SOLUTION_PATTERNS를 패턴마다 re.findall로 페이지 전체를 다시 읽는 대신, 모든 패턴이 그대로
+# 포함하는 '뿌리' 단어를 하나의 교대식으로 한 번만 훑는다. 뿌리끼리는 서로 겹치지 않으므로
+# 모든 출현이 빠짐없이 나오고, 뿌리가 나온 자리에서만 해당 패턴을 match로 확인한다.
+# 패턴별로 findall과 같은 '왼쪽부터, 겹치지 않게' 규칙(next_pos)을 지켜서 점수가 그대로다.
+# 교대식 가지마다 named group을 달면 re가 첫 글자 집합으로 건너뛰는 최적화를 못 해서
+# 15배쯤 느려지므로, 그룹 없이 찾고 찾은 글자로 뿌리 → (패턴, 가중치) 규칙을 고른다.
+HANGUL_PREFIX = '[가-힣]+'
+SOLUTION_ROOTS = ['따라', '따르면', '므로', '반례', '의하여', '의해', '∴', '즉',
+                  '정리하면', '계산하면', '대입하면', '풀어보면']
+
+def _is_hangul(ch:str)->bool:
+    return '가' <= ch <= '힣'
+
+class _RootRule:
+    """패턴 하나: 뿌리 위치에서 findall이 시작했을 위치를 거꾸로 계산해 match로 확인"""
+    def __init__(self, idx:int, pattern:str, weight:int, root:str):
+        self.idx = idx
+        self.rx = re.compile(pattern, re.IGNORECASE)
+        self.weight = weight
+        lead = pattern[:pattern.index(root)]
+        self.hangul = lead.startswith(HANGUL_PREFIX)
+        if self.hangul:
+            # [가-힣]+ 뒤, 뿌리 앞 고정 글자 (예: '에\s*' → '에' + 공백 허용)
+            lead = lead[len(HANGUL_PREFIX):]
+            self.spaces = lead.endswith(r'\s*')
+            self.lead = lead[:-3] if self.spaces else lead
+        else:
+            self.offset = len(re.sub(r'\\(.)', r'\1', lead))
+
+    def start(self, text:str, q:int, next_pos:int)->int:
+        """뿌리가 q에 있을 때 findall이 이 패턴을 시도할 위치, 불가능하면 -1"""
+        if not self.hangul:
+            s = q - self.offset
+            return s if s >= next_pos else -1
+        j = q
+        if self.spaces:
+            while j > 0 and text[j-1].isspace():
+                j -= 1
+        p = j - len(self.lead)
+        if p < 1 or text[p:j] != self.lead or not _is_hangul(text[p-1]):
+            return -1
+        r = p - 1
+        while r > next_pos and _is_hangul(text[r-1]):
+            r -= 1
+        return r if r >= next_pos else -1
+
+def _build_root_rules():
+    rules = {root: [] for root in SOLUTION_ROOTS}
+    for idx, (pattern, weight) in enumerate(SOLUTION_PATTERNS):
+        roots = [root for root in SOLUTION_ROOTS if root in pattern]
+        if len(roots) != 1:
+            raise ValueError(f"해설 패턴 {pattern!r}에 맞는 뿌리 단어가 하나가 아닙니다: {roots}")
+        rules[roots[0]].append(_RootRule(idx, pattern, weight, roots[0]))
+    return rules
+
+SOLUTION_ROOT_RULES = _build_root_rules()
+PAGE_SCAN_RX = re.compile(
+    "|".join(re.escape(root) for root in SOLUTION_ROOTS)
+    + f"|{TABULAR_RX.pattern}|{CHOICE_TOKEN_RX.pattern}"
+)
+
+@dataclass
+class PageFeatures:
+    solution_score:int
+    has_tab:bool
+    choice_tokens:int
+
+def scan_page(page_text:str)->PageFeatures:
+    """해설 점수, tabular 여부, 선택 토큰 수를 페이지를 한 번 훑어서 계산"""
+    solution_score = 0
+    has_tab = False
+    choice_tokens = 0
+    next_pos = [0] * len(SOLUTION_PATTERNS)
+    failed_at = [-1] * len(SOLUTION_PATTERNS)  # 이 위치에서 이미 실패 → 같은 한글 덩어리에서 다시 안 봄
+    for m in PAGE_SCAN_RX.finditer(page_text):
+        rules = SOLUTION_ROOT_RULES.get(m.group())
+        if rules is None:
+            # 뿌리가 아니면 선택 토큰 '(n)' 또는 \begin{tabular}
+            if m.group().startswith('('):
+                choice_tokens += 1
+            else:
+                has_tab = True
+            continue
+        q = m.start()
+        for rule in rules:
+            start = rule.start(page_text, q, next_pos[rule.idx])
+            if start < 0 or start == failed_at[rule.idx]:
+                continue
+            hit = rule.rx.match(page_text, start)
+            if hit is None:
+                failed_at[rule.idx] = start
+                continue
+            solution_score += rule.weight
+            next_pos[rule.idx] = hit.end()
+    return PageFeatures(solution_score, has_tab, choice_tokens)
+
+def scan_page_reference(page_text:str)->tuple:
+    """패턴마다 페이지 전체를 다시 훑는 기존 방식 (--bench 비교용), (해설 점수, 답안표 여부)"""
+    t = page_text
+    solution_score = 0
+    for pattern, score in SOLUTION_PATTERNS:
+        matches = re.findall(pattern, t, re.IGNORECASE)
+        solution_score += len(matches) * score
+    has_tab = bool(re.search(r'\\begin\{tabular\}', t))
+    choice_tokens = len(re.findall(r'\(\s*[1-5]\s*\)', t))
+    amp = t.count('&'); bs = t.count('\\\\')
+    letters = len(re.findall(r'[가-힣a-zA-Z]', t))
+    symbols = len(re.findall(r'[0-9\(\)\[\]\{\}&\\\\=\+\-\*/\.,]+', t))
+    ans_table = ((has_tab and choice_tokens >= 6 and (amp+bs) >= 6 and letters <= 40)
+                 or (choice_tokens >= 10 and letters <= 30 and (amp+bs) >= 2)
+                 or (letters <= 25 and symbols >= 120 and choice_tokens >= 6))
+    return solution_score, ans_table
+
+def scan_page_scores(page_text:str)->tuple:
+    """scan_page 기준 (해설 점수, 답안표 여부)"""
+    features = scan_page(page_text)
+    return features.solution_score, answer_table_from_counts(page_text, features.has_tab, features.choice_tokens)
+
 # ----------------- 페이지 분할 -----------------
 def split_pages(text:str):
-    pages=[]; cur=[]; pno=None
-    for raw in text.splitlines():
-        if m := PAGE_MARK_RX.match(norm(raw)):
+    return list(iter_pages(text.splitlines()))
+
+def iter_pages(lines:Iterable[str])->Iterator[tuple[int, LineStore]]:
+    """줄 이터레이터에서 (pno, lines)를 한 페이지씩 생성 (메모리에는 현재 페이지만)
+
+    lines는 원본 줄 시퀀스처럼 쓰는 LineStore로, 페이지 마크 판정에 쓴 정규화 줄을
+    그대로 들고 있어서 classify_page가 다시 정규화하지 않는다.
+    """
+    raw=[]; det=[]; folded=[]; pno=None
+    for line in lines:
+        d = strip_invisible(line); f = fold(d)
+        if f.startswith("<<<") and (m := PAGE_MARK_RX.match(f)):
             if pno is not None:
-                pages.append((pno, cur)); cur=[]
+                yield pno, LineStore(raw, det, folded, pno); raw=[]; det=[]; folded=[]
             pno = int(m.group(1)); continue
         if pno is None: pno = 1
-        cur.append(raw)
-    if pno is not None: pages.append((pno, cur))
-    return pages
+        raw.append(line); det.append(d); folded.append(f)
+    if pno is not None: yield pno, LineStore(raw, det, folded, pno)
+
+def read_lines(path:Path, chunk_size:int=1 << 16)->Iterator[str]:
+    """파일을 chunk_size씩 읽으며 read_text().splitlines()와 같은 줄을 차례로 생성"""
+    with open(path, encoding="utf-8") as f:
+        rest = ""
+        while chunk := f.read(chunk_size):
+            parts = (rest + chunk).splitlines(keepends=True)
+            # 마지막 조각은 다음 덩어리와 이어질 수 있으므로 남겨 둠
+            rest = parts.pop() if parts else ""
+            for part in parts:
+                yield part.splitlines()[0]
+        if rest:
+            yield rest.splitlines()[0]
+
+def stream_pages(stream_path:Path):
+    """convert_pdf.py --stream 출력(JSONL)을 따라가며 split_pages와 같은 (pno, lines) 생성
+
+    result.paged.mmd에서는 페이지 사이에 줄바꿈이 하나 더 들어가므로, 마지막 페이지인지
+    알 수 있도록 한 페이지씩 늦게 내보낸다. OCR을 건너뛴 페이지는 내보내지 않는다.
+    """
+    from page_stream import follow_pages
+    prev = None
+    for pno, mmd in follow_pages(stream_path):
+        if mmd is None: continue
+        if prev is not None:
+            yield prev[0], (prev[1] + "\n").splitlines()
+        prev = (pno, mmd)
+    if prev is not None:
+        yield prev[0], prev[1].splitlines()
 
 @dataclass
 class Stat:
@@ -129,22 +286,24 @@ def classify_page(pno:int, raw_lines:list[str])->Stat:
     question_score = 0
     score_hits = 0
 
-    # 페이지 전체 텍스트
-    page_text = norm("\n".join(raw_lines))
+    # 줄마다 한 번만 정규화 (iter_pages가 준 LineStore면 이미 정규화돼 있음)
+    store = raw_lines if isinstance(raw_lines, LineStore) else LineStore.from_lines(list(raw_lines), fold_lines=True)
+    folded = store.folded_lines()
+
+    # 페이지 전체 텍스트 (줄 앞뒤 공백 차이는 판정 패턴 결과에 영향 없음)
+    page_text = "\n".join(folded)
     
     # 문항 종료 신호 검색 (이미지 링크 제외)
-    for ln in raw_lines:
-        det = norm(ln)
+    for det in folded:
         if not det: continue
 
         # 이미지 링크가 아닌 경우에만 종료 신호로 인식
         if (QUESTION_END_RX.search(det) and not IMAGE_LINK_RX.search(det)):
             question_ends += 1
 
-    # 해설 패턴 점수 계산
-    for pattern, score in SOLUTION_PATTERNS:
-        matches = re.findall(pattern, page_text, re.IGNORECASE)
-        solution_score += len(matches) * score
+    # 해설 패턴 점수 계산 (답안표 판정용 tabular/선택 토큰도 같은 스캔에서)
+    features = scan_page(page_text)
+    solution_score += features.solution_score
 
     # 문항 점수 계산
     question_score += question_ends * 30  # 문항 종료 신호만
@@ -152,7 +311,7 @@ def classify_page(pno:int, raw_lines:list[str])->Stat:
 
     # 기타 신호들
     score_hits = len(SCORE_BRACKET_RX.findall(page_text))
-    ans_table = looks_like_answer_table(page_text)
+    ans_table = answer_table_from_counts(page_text, features.has_tab, features.choice_tokens)
 
     # ---- 최우선 조건: 문항 종료 신호가 없으면 해설 페이지 ----
     if question_ends == 0:
@@ -180,6 +339,109 @@ def classify_page(pno:int, raw_lines:list[str])->Stat:
     return Stat(pno, len(raw_lines), question_ends, solution_score,
                 question_score, score_hits, ans_table, True, "KEEP_DEFAULT")
 
+def classify_pages(pages:Iterable[tuple[int, list[str]]])->Iterator[tuple[Stat, list[str]]]:
+    """(pno, lines) 이터레이터를 받아 페이지마다 (판정, 줄) 생성
+
+    iter_pages(read_lines(path)) 또는 stream_pages(...)와 이어 쓰면 문서 전체를 올리지 않고
+    한 페이지씩 판정한다. 남길 페이지인지는 stat.keep으로 확인.
+    """
+    for pno, lines in pages:
+        yield classify_page(pno, lines), lines
+
+def write_page(out:TextIO, pno:int, lines:list[str], first:bool):
+    """출력 파일에 페이지 하나 덧붙이기 (전체를 "\n".join한 것과 같은 결과)"""
+    if not first:
+        out.write("\n")
+    out.write("\n".join([f"<<<PAGE {pno}>>>", *lines]))
+
+# ----------------- 일괄 판정 (임계값 보정용) -----------------
+PAGED_NAMES = ("result.paged.mmd", "result_paged.mmd")
+DEFAULT_BATCH_OUT = "output/filter_batch.jsonl"
+
+def find_paged_mmds(root:Path)->list[Path]:
+    """root 아래 모든 폴더의 result.paged.mmd (없으면 result_paged.mmd), 경로 순"""
+    found = {}
+    for name in reversed(PAGED_NAMES):
+        for p in root.rglob(name):
+            found[p.parent] = p  # 같은 폴더에 둘 다 있으면 result.paged.mmd 우선
+    return [found[d] for d in sorted(found)]
+
+def classify_file(path:str)->list[dict]:
+    """파일 하나를 판정해 페이지별 Stat 행 목록 반환 (프로세스 풀 작업 단위)"""
+    rows = []
+    for pno, lines in iter_pages(read_lines(Path(path))):
+        t0 = time.perf_counter()
+        st = classify_page(pno, lines)
+        rows.append({"file": path, **asdict(st), "ms": round((time.perf_counter() - t0) * 1000, 3)})
+    return rows
+
+def run_batch(root:Path, out_path:Path, procs:int=0):
+    """root 아래 모든 paged mmd를 여러 프로세스로 판정해 페이지별 Stat을 JSONL로 저장"""
+    from collections import Counter
+    from concurrent.futures import ProcessPoolExecutor
+
+    files = find_paged_mmds(root)
+    if not files:
+        raise SystemExit(f"{root} 아래에서 result.paged.mmd 파일을 찾을 수 없습니다.")
+    procs = procs or os.cpu_count() or 1
+    print(f"[*] 파일 {len(files)}개를 프로세스 {procs}개로 판정 → {out_path}")
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    pages = kept = 0
+    classify_ms = 0.0
+    reasons = Counter()
+    with ProcessPoolExecutor(max_workers=procs) as executor, open(out_path, "w", encoding="utf-8") as out:
+        # map은 제출 순서대로 돌려주므로 출력 순서가 실행마다 같다
+        for rows in executor.map(classify_file, [str(p) for p in files]):
+            for row in rows:
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                pages += 1
+                kept += row["keep"]
+                classify_ms += row["ms"]
+                reasons[row["reason"]] += 1
+    elapsed = time.perf_counter() - t0
+
+    print(f"[OK] 페이지 {pages}개 판정 (남김 {kept}, 제거 {pages - kept}), "
+          f"{elapsed:.2f}초 ({pages / max(elapsed, 1e-9):.0f}페이지/초, 판정 시간 합 {classify_ms / 1000:.2f}초)")
+    for reason, n in reasons.most_common():
+        print(f"    {reason:<28} {n}")
+
+# ----------------- 벤치마크 -----------------
+def run_bench(repeat:int=5):
+    """history/sample*의 모든 페이지로 단일 스캔과 기존 방식의 점수가 같은지 확인하고 속도 비교"""
+    texts = []
+    for sample_dir in find_sample_pdfs():
+        for cand in PAGED_NAMES:
+            p = sample_dir / cand
+            if p.exists():
+                pages = split_pages(p.read_text(encoding="utf-8"))
+                texts.extend("\n".join(lines.folded_lines()) for _, lines in pages)
+                break
+    if not texts:
+        raise SystemExit("history 폴더에서 result.paged.mmd 파일을 찾을 수 없습니다.")
+
+    mismatched = [i for i, t in enumerate(texts) if scan_page_scores(t) != scan_page_reference(t)]
+
+    def best_of(fn):
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for t in texts:
+                fn(t)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    old = best_of(scan_page_reference)
+    new = best_of(scan_page_scores)
+    chars = sum(len(t) for t in texts)
+    print(f"[BENCH] 페이지 {len(texts)}개 ({chars:,}자), {repeat}회 중 최소")
+    print(f"[BENCH] 기존(패턴별 findall) {old*1000:.1f}ms → 단일 스캔 {new*1000:.1f}ms ({old/new:.1f}배)")
+    if mismatched:
+        raise SystemExit(f"[ERROR] 점수가 다른 페이지 {len(mismatched)}개 (인덱스 {mismatched[:10]})")
+    print("[OK] 모든 페이지의 해설 점수/답안표 판정이 기존과 동일")
+
 # ----------------- 샘플 찾기 -----------------
 def find_sample_pdfs():
     """history 폴더에서 샘플 폴더들을 찾기"""
@@ -239,11 +501,48 @@ def select_sample_interactive():
 def main():
     parser = argparse.ArgumentParser(description="문제 페이지 필터링 스크립트")
     parser.add_argument("--sample", type=str, help="history 폴더의 샘플 번호 (예: sample1)")
+    parser.add_argument("--follow", action="store_true",
+                        help="convert_pdf.py --stream 출력을 따라가며 OCR이 끝나는 페이지부터 바로 판정")
+    parser.add_argument("--bench", action="store_true",
+                        help="history/sample*의 페이지로 단일 스캔과 기존 패턴별 검색을 비교 (점수 동일 확인 + 속도)")
+    parser.add_argument("--batch", type=str, nargs="?", const="history", metavar="DIR",
+                        help="DIR(기본값: history) 아래 모든 result.paged.mmd를 여러 프로세스로 판정해 페이지별 Stat을 JSONL로 저장")
+    parser.add_argument("--batch-out", type=str, default=DEFAULT_BATCH_OUT,
+                        help=f"--batch 결과 JSONL 경로 (기본값: {DEFAULT_BATCH_OUT})")
+    parser.add_argument("--procs", type=int, default=0, help="--batch 프로세스 수 (기본값: CPU 코어 수)")
+    add_job_args(parser)
 
     args = parser.parse_args()
+    if args.bench:
+        run_bench()
+        return
+    if args.batch:
+        run_batch(Path(args.batch), Path(args.batch_out), args.procs)
+        return
+    job_dir = resolve_job_dir(args)
 
     # 모드 결정
-    if args.sample:
+    src = None
+    if args.follow:
+        # 스트림 모드: result.paged.mmd 대신 result.paged.jsonl을 따라감
+        base = job_dir or (Path(f"history/{args.sample}") if args.sample else Path("output"))
+        stream_path = base / STREAM_NAME
+        print(f"[*] 스트림 따라가기: {stream_path}")
+        output_path = base / "result.paged.filtered.mmd"
+    elif job_dir:
+        # 서버 모드(작업 폴더): 작업 폴더 안에서 읽고 씀
+        src = None
+        for cand in ("result.paged.mmd", "result_paged.mmd"):
+            p = job_dir / cand
+            if p.exists():
+                src = p
+                break
+
+        if not src:
+            raise SystemExit(f"{job_dir} 폴더에 result.paged.mmd 파일을 찾을 수 없습니다.")
+
+        output_path = job_dir / "result.paged.filtered.mmd"
+    elif args.sample:
         # 테스트 모드: --sample 옵션 사용
         sample_path = Path(f"history/{args.sample}")
         if not sample_path.exists():
@@ -299,31 +598,36 @@ def main():
             output_dir.mkdir(exist_ok=True)
             output_path = output_dir / "result.paged.filtered.mmd"
 
-    pages = split_pages(src.read_text(encoding="utf-8"))
-    kept = []
-    for pno, lines in pages:
-        st = classify_page(pno, lines)
-
-        # 항상 터미널 로그 출력
-        print(
-            f"[PAGE {st.page:>2}] keep={st.keep:<5} reason={st.reason:<25} "
-            f"(lines={st.lines:>3})  "
-            f"qends={st.question_ends}  "
-            f"q_score={st.question_score} sol_score={st.solution_score} "
-            f"scoreTag={st.score_hits} ansTable={st.ans_table}"
-        )
-
-        if st.keep:
-            kept.append(f"<<<PAGE {pno}>>>")
-            kept.extend(lines)
-
-    if not kept:
-        print("[!] 모든 페이지가 제거됨 → 원본 유지")
-        for pno, lines in pages:
-            kept.append(f"<<<PAGE {pno}>>>")
-            kept.extend(lines)
-
-    output_path.write_text("\n".join(kept), encoding="utf-8")
+    def open_pages():
+        # 파일/스트림 모두 한 페이지씩 읽음 (원본 유지가 필요하면 처음부터 다시 읽음)
+        if src is not None:
+            return iter_pages(read_lines(src))
+        return stream_pages(stream_path)
+
+    # 판정하는 대로 임시 파일에 쓰고, 끝나면 출력 파일로 교체
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    kept = 0
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        for st, lines in classify_pages(open_pages()):
+            # 항상 터미널 로그 출력
+            print(
+                f"[PAGE {st.page:>2}] keep={st.keep:<5} reason={st.reason:<25} "
+                f"(lines={st.lines:>3})  "
+                f"qends={st.question_ends}  "
+                f"q_score={st.question_score} sol_score={st.solution_score} "
+                f"scoreTag={st.score_hits} ansTable={st.ans_table}"
+            )
+
+            if st.keep:
+                write_page(out, st.page, lines, first=kept == 0)
+                kept += 1
+
+        if not kept:
+            print("[!] 모든 페이지가 제거됨 → 원본 유지")
+            for i, (pno, lines) in enumerate(open_pages()):
+                write_page(out, pno, lines, first=i == 0)
+
+    os.replace(tmp_path, output_path)
     print(f"[OK] {output_path} 생성")
 
 if __name__ == "__main__":
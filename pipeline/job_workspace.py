@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+job_workspace.py - 작업(job)별 독립 작업 폴더
+--job-dir 또는 --job-id를 주면 각 단계가 output/, build/ 대신 해당 작업 폴더를 쓴다.
+동시에 여러 업로드를 처리해도 서로의 결과 파일을 덮어쓰지 않는다.
+
+작업 폴더 구성:
+  <job_dir>/result.paged.mmd
+  <job_dir>/result.paged.filtered.mmd
+  <job_dir>/problems.json
+  <job_dir>/build/exam.tex, exam.pdf, images/
+
+정리 정책: 마지막 수정 후 JOB_TTL_HOURS(기본 24시간)가 지난 작업 폴더는 삭제한다.
+convert_pdf.py가 새 작업을 시작할 때 한 번 정리하고, 직접 실행할 수도 있다.
+  python pipeline/job_workspace.py --cleanup [--max-age-hours 24]
+"""
+
+import os
+import re
+import time
+import shutil
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+JOBS_ROOT = Path(os.getenv("JOBS_ROOT", "jobs"))
+DEFAULT_TTL_HOURS = float(os.getenv("JOB_TTL_HOURS", "24"))
+
+JOB_ID_RX = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+def add_job_args(parser: argparse.ArgumentParser):
+    """각 파이프라인 스크립트 공통 --job-dir/--job-id 옵션"""
+    parser.add_argument("--job-dir", type=str, help="작업 폴더 경로 (서버 모드, output/ 대신 사용)")
+    parser.add_argument("--job-id", type=str, help=f"작업 ID ({JOBS_ROOT}/<job-id> 폴더 사용)")
+
+
+def resolve_job_dir(args, create: bool = False) -> Optional[Path]:
+    """옵션에서 작업 폴더 결정 (지정 안 했으면 None)"""
+    job_dir = getattr(args, "job_dir", None)
+    job_id = getattr(args, "job_id", None)
+    if job_dir:
+        path = Path(job_dir)
+    elif job_id:
+        if not JOB_ID_RX.match(job_id) or job_id in (".", ".."):
+            raise SystemExit(f"잘못된 작업 ID: {job_id}")
+        path = JOBS_ROOT / job_id
+    else:
+        return None
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cleanup_jobs(root: Path = JOBS_ROOT, max_age_hours: float = DEFAULT_TTL_HOURS,
+                 keep: Optional[Path] = None) -> List[Path]:
+    """마지막 수정 후 max_age_hours가 지난 작업 폴더 삭제, 삭제한 목록 반환"""
+    if not root.exists() or max_age_hours <= 0:
+        return []
+    cutoff = time.time() - max_age_hours * 3600
+    keep_resolved = keep.resolve() if keep else None
+    removed = []
+    for job in root.iterdir():
+        if not job.is_dir() or (keep_resolved and job.resolve() == keep_resolved):
+            continue
+        try:
+            newest = max((p.stat().st_mtime for p in job.rglob("*")), default=job.stat().st_mtime)
+        except FileNotFoundError:
+            continue
+        if newest < cutoff:
+            shutil.rmtree(job, ignore_errors=True)
+            removed.append(job)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="작업 폴더 정리")
+    parser.add_argument("--cleanup", action="store_true", help="오래된 작업 폴더 삭제")
+    parser.add_argument("--root", type=str, default=str(JOBS_ROOT), help=f"작업 폴더 루트 (기본값: {JOBS_ROOT})")
+    parser.add_argument("--max-age-hours", type=float, default=DEFAULT_TTL_HOURS,
+                        help=f"보존 시간 (기본값: {DEFAULT_TTL_HOURS:g})")
+    args = parser.parse_args()
+
+    if not args.cleanup:
+        parser.print_help()
+        return
+
+    removed = cleanup_jobs(Path(args.root), args.max_age_hours)
+    for job in removed:
+        print(f"[OK] 삭제: {job}")
+    print(f"[OK] 작업 폴더 {len(removed)}개 정리")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+line_store.py - paged mmd 텍스트 분석 공용 코어 (filter_pages.py, split.py)
+두 단계가 각자 INVIS_RX/정규화/페이지 마크 정규식을 두고 같은 문서를 처음부터 다시
+읽고 정규화하던 것을 합친다. 문서(또는 한 페이지)를 한 번 읽어 아래를 보관한다.
+
+  raw[i]      줄 끝 문자를 뗀 원본 줄
+  det[i]      보이지 않는 문자 제거 + strip (split.py 감지용)
+  folded[i]   det에 NFKC + 괄호/마침표 치환 (filter_pages.py 판정용, fold_lines=True이거나 folded_lines()를 부른 뒤)
+  page_no[i]  줄이 속한 페이지 번호 (array, 페이지 마크 줄은 그 페이지)
+  marks       페이지 마크 줄 인덱스 (array)
+
+페이지 마크는 가장 많이 정규화된 줄(folded가 있으면 folded, 없으면 det)로 판정한다.
+바뀐 내용이 없으면 re.sub/strip이 원래 문자열 객체를 그대로 돌려주므로 det는 대부분
+raw와 같은 객체를 공유한다.
+"""
+
+import re
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import List, Optional
+
+PAGE_MARK_RX = re.compile(r"^<<<PAGE\s+(\d+)\s*>>>$")
+INVIS_RX = re.compile(r"[\u200B-\u200F\u202A-\u202E\u2060\u2066-\u2069\uFEFF\u00A0]")
+TRANS = str.maketrans({
+    "（":"(", "）":")", "［":"[", "］":"]", "．":".", "。":".",
+    "【":"[", "】":"]", "「":"[", "」":"]", "｢":"[", "｣":"]"
+})
+
+
+def strip_invisible(s: str) -> str:
+    """보이지 않는 문자 제거 + 앞뒤 공백 제거 (감지용 정규화)"""
+    if not s:
+        return ""
+    return INVIS_RX.sub("", s).strip()
+
+
+def fold(det: str) -> str:
+    """strip_invisible 결과에 NFKC + 괄호/마침표 치환 (판정용 정규화)"""
+    if not det:
+        return ""
+    return unicodedata.normalize("NFKC", det).translate(TRANS).strip()
+
+
+def normalize(s: str) -> str:
+    """원본 줄 → 판정용 정규화 (strip_invisible + fold)"""
+    return fold(strip_invisible(s))
+
+
+class LineStore:
+    """줄 목록 하나의 원본/정규화 줄과 페이지 경계
+
+    원본 줄의 시퀀스처럼 쓸 수 있다 (len, 인덱스, 반복은 raw 기준).
+    """
+
+    __slots__ = ("raw", "det", "folded", "page_no", "marks")
+
+    def __init__(self, raw: List[str], det: Optional[List[str]] = None,
+                 folded: Optional[List[str]] = None, page: int = 1):
+        self.raw = raw
+        self.det = det if det is not None else [strip_invisible(s) for s in raw]
+        self.folded = folded
+        self.page_no = array("q")
+        self.marks = array("q")
+        key = folded if folded is not None else self.det
+        for i, s in enumerate(key):
+            if s.startswith("<<<") and (m := PAGE_MARK_RX.match(s)):
+                page = int(m.group(1))
+                self.marks.append(i)
+            self.page_no.append(page)
+
+    @classmethod
+    def from_text(cls, text: str, fold_lines: bool = False) -> "LineStore":
+        """readlines()+rstrip('\\n')와 같은 줄 나누기 ('\\n' 기준, 끝의 빈 줄 없음)"""
+        raw = text.split("\n")
+        if raw[-1] == "":
+            raw.pop()
+        return cls.from_lines(raw, fold_lines)
+
+    @classmethod
+    def from_lines(cls, raw: List[str], fold_lines: bool = False) -> "LineStore":
+        det = [strip_invisible(s) for s in raw]
+        return cls(raw, det, [fold(d) for d in det] if fold_lines else None)
+
+    @classmethod
+    def read(cls, path: Path, fold_lines: bool = False) -> "LineStore":
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return cls.from_text(f.read(), fold_lines)
+
+    def folded_lines(self) -> List[str]:
+        """판정용 정규화 줄 (처음 부를 때 한 번만 계산)"""
+        if self.folded is None:
+            self.folded = [fold(d) for d in self.det]
+        return self.folded
+
+    def page_at(self, idx: int) -> int:
+        """idx(0-base) 줄의 페이지 번호, 끝을 넘으면 마지막 줄 기준 (첫 줄 앞이나 빈 문서는 1)"""
+        if idx < 0 or not self.page_no:
+            return 1
+        return self.page_no[min(idx, len(self.page_no) - 1)]
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __getitem__(self, idx):
+        return self.raw[idx]
+
+    def __iter__(self):
+        return iter(self.raw)
@@ -22,14 +22,22 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 import os
 import re
+import threading
+from contextlib import nullcontext
 from pymongo import MongoClient
 from bson import ObjectId
 from datetime import datetime
 from dotenv import load_dotenv
+from job_workspace import add_job_args, resolve_job_dir
+from fair_share import FairShareScheduler, DEFAULT_CAPACITY, job_name
+from adaptive_concurrency import AimdLimiter, is_overload_error, is_overload_status
 
 # .env 파일 로드
 load_dotenv()
 
+# 스레드별 마지막 DeepSeek 호출 결과 (HTTP 상태 코드 또는 예외) - 동시 처리 수 자동 조절에 사용
+LAST_CALL = threading.local()
+
 
 def load_problems_json(file_path: str) -> List[Dict]:
     """problems.json 파일을 로드합니다."""
@@ -100,6 +108,8 @@ def save_to_mongodb(problems: List[Dict], user_id: str, filename: str, parent_pa
 
 def call_llm_for_structure(problem: Dict) -> Optional[List[Dict]]:
     """문제 하나를 DeepSeek에 보내서 구조화된 형태로 변환합니다. 다중 문제인 경우 리스트 반환."""
+    LAST_CALL.status = None
+    LAST_CALL.error = None
 
     # DeepSeek API 키 설정
     api_key = os.getenv('DEEPSEEK_API_KEY')
@@ -202,6 +212,7 @@ def call_llm_for_structure(problem: Dict) -> Optional[List[Dict]]:
             json=data,
             timeout=60
         )
+        LAST_CALL.status = response.status_code
 
         # UTF-8 인코딩 명시
         response.encoding = 'utf-8'
@@ -368,13 +379,43 @@ def call_llm_for_structure(problem: Dict) -> Optional[List[Dict]]:
             return None
 
     except Exception as e:
+        LAST_CALL.error = e
         print(f"LLM 호출 중 오류 (ID {problem.get('id')}): {e}")
         return None
 
 
-def structure_problems_parallel(problems: List[Dict], max_workers: int = 30) -> List[Dict]:
-    """문제들을 병렬로 구조화합니다."""
-    print(f"{len(problems)}개 문제를 {max_workers}개 스레드로 병렬 처리 중...")
+def last_call_overloaded() -> bool:
+    """이 스레드의 마지막 DeepSeek 호출이 429/5xx/타임아웃이었는지"""
+    status = getattr(LAST_CALL, 'status', None)
+    if status is not None:
+        return is_overload_status(status)
+    error = getattr(LAST_CALL, 'error', None)
+    return error is not None and is_overload_error(error)
+
+
+def call_llm_with_slot(problem: Dict, scheduler: Optional[FairShareScheduler],
+                       limiter: Optional[AimdLimiter] = None) -> Optional[List[Dict]]:
+    """공용 LLM 슬롯을 받은 뒤 구조화 호출 (스케줄러/제한기가 없으면 바로 호출)"""
+    with limiter.slot() if limiter is not None else nullcontext() as outcome:
+        with scheduler.slot() if scheduler is not None else nullcontext():
+            result = call_llm_for_structure(problem)
+        if outcome is not None:
+            outcome["error"] = last_call_overloaded()
+    return result
+
+
+def structure_problems_parallel(problems: List[Dict], max_workers: int = 30,
+                                scheduler: Optional[FairShareScheduler] = None,
+                                limiter: Optional[AimdLimiter] = None) -> List[Dict]:
+    """문제들을 병렬로 구조화합니다. scheduler가 있으면 호스트 공용 슬롯을 사용자별로 나눠 씁니다.
+
+    limiter가 있으면 max_workers는 스레드 풀 상한이고, 실제 동시 호출 수는
+    limiter가 지연과 429/5xx 비율을 보고 조절합니다.
+    """
+    if limiter is not None:
+        print(f"{len(problems)}개 문제를 동시 {limiter.limit}개에서 시작해 최대 {max_workers}개 스레드로 병렬 처리 중...")
+    else:
+        print(f"{len(problems)}개 문제를 {max_workers}개 스레드로 병렬 처리 중...")
     start_time = time.time()
 
     structured_problems = []
@@ -385,7 +426,7 @@ def structure_problems_parallel(problems: List[Dict], max_workers: int = 30) ->
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # 모든 문제에 대해 LLM 호출 시작
         future_to_problem = {
-            executor.submit(call_llm_for_structure, problem): problem
+            executor.submit(call_llm_with_slot, problem, scheduler, limiter): problem
             for problem in problems
         }
 
@@ -513,7 +554,20 @@ def main():
     parser.add_argument('--user-id', type=str, help='User ID (서버 모드)')
     parser.add_argument('--filename', type=str, help='Filename (서버 모드)')
     parser.add_argument('--parent-path', type=str, help='Parent path (서버 모드)')
+    parser.add_argument('--fair-share', action='store_true', default=os.getenv('FAIR_SHARE') == '1',
+                        help='호스트의 모든 작업이 LLM 동시 호출 슬롯을 사용자별로 공정하게 나눠 씀 (env FAIR_SHARE=1)')
+    parser.add_argument('--share-weight', type=float, default=1.0, help='공정 분배 가중치 (기본값: 1)')
+    parser.add_argument('--share-capacity', type=int,
+                        default=int(os.getenv('LLM_CONCURRENCY', DEFAULT_CAPACITY['llm'])),
+                        help=f"호스트 전체 LLM 동시 호출 수 (기본값: {DEFAULT_CAPACITY['llm']})")
+    parser.add_argument('--workers', type=int, default=30, help='동시 LLM 호출 수 (기본값: 30)')
+    parser.add_argument('--auto-workers', action='store_true', default=os.getenv('AUTO_WORKERS') == '1',
+                        help='--workers에서 시작해 지연/429·5xx 비율을 보고 동시 호출 수를 자동 조절 (AIMD, env AUTO_WORKERS=1)')
+    parser.add_argument('--max-workers', type=int, default=64,
+                        help='--auto-workers로 늘릴 수 있는 최대 동시 호출 수 (기본값: 64)')
+    add_job_args(parser)
     args = parser.parse_args()
+    job_dir = resolve_job_dir(args)
 
     # 커맨드라인 인자 우선, 없으면 환경변수 확인
     user_id = args.user_id or os.getenv('USER_ID')
@@ -524,7 +578,7 @@ def main():
     if user_id:
         # 서버 모드
         print("LLM Structure Script 시작 (서버 모드)")
-        input_file = "output/problems.json"
+        input_file = str(job_dir / "problems.json") if job_dir else "output/problems.json"
         parent_path = parent_path or "내 파일"
 
         if not Path(input_file).exists():
@@ -561,7 +615,24 @@ def main():
     print(f"폴더 경로: {parent_path}")
 
     # 문제 구조화 (병렬 처리)
-    structured_problems = structure_problems_parallel(problems, max_workers=30)
+    scheduler = None
+    if args.fair_share:
+        scheduler = FairShareScheduler("llm", user_id, job_name(args), len(problems),
+                                       args.share_weight, args.share_capacity)
+    limiter = None
+    max_workers = args.workers
+    if args.auto_workers:
+        limiter = AimdLimiter("llm", args.workers, max_limit=max(args.workers, args.max_workers))
+        max_workers = limiter.max_limit
+    try:
+        structured_problems = structure_problems_parallel(problems, max_workers=max_workers,
+                                                          scheduler=scheduler, limiter=limiter)
+    finally:
+        if scheduler is not None:
+            scheduler.close()
+            print(f"[FAIR] {scheduler.summary()}")
+        if limiter is not None:
+            print(f"[AIMD] {limiter.summary()}")
 
     if not structured_problems:
         print("구조화된 문제가 없습니다.")
@@ -20,6 +20,8 @@ from urllib.parse import urlparse
 import requests
 import base64
 import json
+import argparse
+from job_workspace import add_job_args, resolve_job_dir
 
 # UTF-8 인코딩 강제 설정 (Windows cp949 문제 해결)
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -35,6 +37,12 @@ MONGODB_DATABASE = os.getenv('MONGODB_DATABASE', 'ZeroTyping')
 BUILD = Path("build")
 IMGDIR = BUILD / "images"
 
+def set_build_dir(build_dir: Path):
+    """빌드 폴더 변경 (작업 폴더 모드: <job_dir>/build)"""
+    global BUILD, IMGDIR
+    BUILD = Path(build_dir)
+    IMGDIR = BUILD / "images"
+
 META = {
     "academy": "수학학원명",
     "grade": "고1",
@@ -814,12 +822,22 @@ def build_pdf(tex_path):
 def main():
     try:
         # 커맨드라인 인자로 문제 ID 받기
-        if len(sys.argv) < 2:
-            print("사용법: python make_pdf.py <problem_id1> <problem_id2> ...")
+        parser = argparse.ArgumentParser(description="MongoDB 문제로 PDF 시험지 생성")
+        parser.add_argument("problem_ids", nargs="*", help="문제 ID 목록")
+        add_job_args(parser)
+        args = parser.parse_args()
+
+        if not args.problem_ids:
+            print("사용법: python make_pdf.py [--job-dir DIR | --job-id ID] <problem_id1> <problem_id2> ...")
             print("예: python make_pdf.py 68f078a2122c05354d2e3f65 68f078a2122c05354d2e3f66")
             return
 
-        problem_ids = sys.argv[1:]  # 첫 번째 인자부터 모두 문제 ID로 사용
+        job_dir = resolve_job_dir(args, create=True)
+        if job_dir:
+            set_build_dir(job_dir / "build")
+            print(f"작업 폴더: {job_dir}")
+
+        problem_ids = args.problem_ids
         print(f"입력받은 문제 ID: {len(problem_ids)}개")
 
         # MongoDB 연결
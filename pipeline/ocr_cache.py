@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+ocr_cache.py - Mathpix 페이지 OCR 결과 디스크 캐시
+단일 페이지 PDF 바이트 + 옵션 JSON의 해시를 키로 mmd 텍스트를 저장한다.
+같은 교재를 다시 올리면 캐시된 페이지는 네트워크를 타지 않는다.
+"""
+
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CACHE_DIR = "cache/mathpix"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512MB
+
+
+def cache_key(pdf_bytes: bytes, options_json: str) -> str:
+    """페이지 바이트와 옵션 JSON으로 콘텐츠 주소 키 생성"""
+    h = hashlib.sha256()
+    h.update(pdf_bytes)
+    h.update(b"\0")
+    h.update(options_json.encode("utf-8"))
+    return h.hexdigest()
+
+
+class OcrCache:
+    """크기 제한 LRU 디스크 캐시
+
+    - 항목 하나가 파일 하나(<root>/<key[:2]>/<key>.mmd)
+    - 최근 사용 시각은 파일 mtime으로 관리 (조회 시 갱신)
+    - 전체 크기가 max_bytes를 넘으면 오래된 항목부터 삭제
+    여러 변환 프로세스가 같은 디렉토리를 공유해도 되도록 쓰기는 임시 파일 + rename으로 한다.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._scan())
+
+    def _scan(self):
+        """(mtime, size, path) 목록 (다른 프로세스가 지운 파일은 건너뜀)"""
+        entries = []
+        for fp in self.root.glob("*/*.mmd"):
+            try:
+                st = fp.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, fp))
+        return entries
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.mmd"
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시 조회 (없으면 None)"""
+        fp = self._path(key)
+        try:
+            mmd = fp.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(fp)  # LRU 갱신 (그 사이 다른 프로세스가 지웠어도 읽은 결과는 그대로 씀)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return mmd
+
+    def put(self, key: str, mmd: str):
+        """캐시 저장 후 크기 초과 시 LRU 정리"""
+        fp = self._path(key)
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        tmp = fp.with_name(f"{fp.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(mmd, encoding="utf-8")
+        size = tmp.stat().st_size
+        with self._lock:
+            # 같은 키를 덮어쓰면(같은 페이지를 두 워커가 저장, 헤지 중복 등) 이전 크기는 빼야 함
+            try:
+                old_size = fp.stat().st_size
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp, fp)
+            self._total_bytes += size - old_size
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 가장 오래 안 쓴 항목 삭제
+
+        평소에는 메모리의 누적 크기만 보고, 한도를 넘었을 때만 디렉토리를 다시 훑는다.
+        """
+        with self._lock:
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            entries.sort()
+            for _, size, fp in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    fp.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+            self._total_bytes = total
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = (self.hits / lookups * 100) if lookups else 0.0
+        return (f"hit={self.hits} miss={self.misses} ({rate:.0f}%) "
+                f"evicted={self.evictions} dir={self.root}")
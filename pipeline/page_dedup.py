@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+page_dedup.py - OCR 전에 빈 페이지와 중복 페이지 골라내기
+스캔 문제집에는 섹션 사이 빈 간지, 섹션마다 반복되는 표지/유의사항 페이지가 많다.
+빈 페이지는 OCR하지 않고, 같은(또는 거의 같은) 페이지는 한 번만 OCR해서 결과를 복사한다.
+
+  1) 내용 스트림 해시: 페이지 content stream + 리소스 전체(폼 XObject 안의 이미지/폰트까지)의 sha256
+     → 완전히 같은 페이지
+  2) 저해상도 래스터(pdf2image/Pillow): 잉크 비율 + dHash(지각 해시)
+     → 빈 페이지, 다시 스캔된 거의 같은 페이지 (유사 중복은 기본 off)
+
+유사 중복은 여백이 많은 시험지에서 문제 번호/숫자 하나만 다른 페이지도 잡을 수 있고,
+잘못 잡으면 다른 페이지 OCR 결과가 조용히 복사된다. 그래서 near_max_distance를 켰을 때만 보고,
+두 페이지 모두 텍스트 레이어가 있으면 텍스트까지 같아야 중복으로 본다.
+
+pdf2image/poppler가 없으면 1)만 하고 넘어간다.
+"""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+DEDUP_DPI = 36          # 판정용 래스터 해상도 (A4 ≈ 300x420px)
+INK_LEVEL = 128         # 이보다 어두운 픽셀을 잉크로 본다 (0~255 그레이스케일)
+BLANK_MAX_INK = 0.002   # 잉크 비율이 이 이하면 빈 페이지
+HASH_SIZE = 16          # dHash 격자 (16x16 = 256비트)
+NEAR_MAX_DISTANCE = -1  # dHash 해밍 거리가 이 이하면 거의 같은 페이지 (-1=유사 중복 판정 안 함)
+NEAR_SUGGESTED_DISTANCE = 6  # 다시 스캔된 페이지용으로 켤 때 권장값
+NEAR_INK_TOLERANCE = 0.1  # 거의 같은 페이지는 잉크 비율 차이도 10% 이내
+
+
+def _hash_object(h, obj, visited: dict, stream_digests: dict):
+    """PDF 객체 그래프를 재귀로 해시 (폼 XObject 안의 이미지/폰트/중첩 폼까지)
+
+    간접 객체는 처음 만난 순서 번호로 순환을 끊고, 스트림 데이터 해시는 stream_digests에
+    (객체 번호 기준) 저장해 여러 페이지가 공유하는 폰트/이미지를 다시 풀지 않는다.
+    /Parent는 페이지 트리로 올라가므로 따라가지 않는다.
+    """
+    ref = None
+    if isinstance(obj, IndirectObject):
+        ref = (obj.idnum, obj.generation)
+        if ref in visited:
+            h.update(b"@%d;" % visited[ref])
+            return
+        visited[ref] = len(visited)
+        obj = obj.get_object()
+
+    if isinstance(obj, DictionaryObject):
+        h.update(b"<<")
+        for key in sorted(obj):
+            if key == "/Parent":
+                continue
+            h.update(str(key).encode("utf-8"))
+            _hash_object(h, obj.raw_get(key), visited, stream_digests)
+        h.update(b">>")
+        if isinstance(obj, StreamObject):
+            digest = stream_digests.get(ref) if ref is not None else None
+            if digest is None:
+                digest = hashlib.sha256(obj.get_data()).digest()
+                if ref is not None:
+                    stream_digests[ref] = digest
+            h.update(b"stream")
+            h.update(digest)
+    elif isinstance(obj, ArrayObject):
+        h.update(b"[")
+        for item in obj:
+            _hash_object(h, item, visited, stream_digests)
+        h.update(b"]")
+    else:
+        h.update(repr(obj).encode("utf-8"))
+        h.update(b";")
+
+
+def content_digest(page, stream_digests: Optional[dict] = None) -> Optional[str]:
+    """페이지 내용 스트림과 /Resources 전체(폼 XObject의 리소스 포함)의 sha256 (읽을 수 없으면 None)
+
+    스캔 페이지가 '/Fm0 Do' 한 줄이고 실제 이미지는 폼 안에 있는 경우에도
+    페이지마다 다른 이미지가 해시에 들어가도록 리소스를 끝까지 따라간다.
+    stream_digests는 한 문서 안에서 페이지끼리 공유하는 스트림 해시 캐시.
+    """
+    if stream_digests is None:
+        stream_digests = {}
+    h = hashlib.sha256()
+    try:
+        contents = page.get_contents()
+        h.update(contents.get_data() if contents is not None else b"")
+        resources = page.raw_get("/Resources") if "/Resources" in page else None
+        if resources is not None:
+            _hash_object(h, resources, {}, stream_digests)
+    except Exception:
+        return None
+    return h.hexdigest()
+
+
+def is_empty_content(page) -> bool:
+    """그리는 내용이 전혀 없는 페이지 (내용 스트림이 비었고 XObject도 없음)"""
+    try:
+        contents = page.get_contents()
+        data = contents.get_data() if contents is not None else b""
+    except Exception:
+        return False
+    return not data.strip()
+
+
+def ink_coverage(img) -> float:
+    """그레이스케일 이미지에서 잉크(어두운 픽셀) 비율"""
+    hist = img.histogram()
+    total = sum(hist)
+    return sum(hist[:INK_LEVEL]) / total if total else 0.0
+
+
+def dhash(img, size: int = HASH_SIZE) -> int:
+    """가로 방향 밝기 차이 기반 지각 해시 (size*size 비트)"""
+    from PIL import Image
+    small = img.resize((size + 1, size), Image.BILINEAR)
+    px = list(small.getdata())
+    bits = 0
+    for y in range(size):
+        row = px[y * (size + 1):(y + 1) * (size + 1)]
+        for x in range(size):
+            bits = (bits << 1) | (row[x] > row[x + 1])
+    return bits
+
+
+def text_layer(page) -> str:
+    """공백을 정리한 텍스트 레이어 (없거나 못 읽으면 빈 문자열)"""
+    try:
+        return " ".join((page.extract_text() or "").split())
+    except Exception:
+        return ""
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def raster_fingerprints(pdf_path: Path, dpi: int = DEDUP_DPI) -> Optional[List[tuple]]:
+    """페이지별 (잉크 비율, dHash) 목록, pdf2image/poppler를 쓸 수 없으면 None"""
+    try:
+        from pdf2image import convert_from_path
+        images = convert_from_path(str(pdf_path), dpi=dpi, grayscale=True)
+    except Exception as e:
+        print(f"[DEDUP] 래스터 판정 생략 (pdf2image/poppler 사용 불가): {e}")
+        return None
+    prints = []
+    for img in images:
+        img = img.convert("L")
+        prints.append((ink_coverage(img), dhash(img)))
+    return prints
+
+
+class DedupResult:
+    """blank: 빈 페이지 인덱스, duplicates: 원본 페이지 → 같은 결과를 쓸 중복 페이지 목록 (0-base)"""
+
+    def __init__(self):
+        self.blank: List[int] = []
+        self.duplicates: Dict[int, List[int]] = {}
+        self.exact = 0
+        self.near = 0
+        self.seconds = 0.0
+
+    def duplicate_pages(self) -> set:
+        return {dup for dups in self.duplicates.values() for dup in dups}
+
+    def summary(self) -> str:
+        return (f"빈 페이지 {len(self.blank)}개, 중복 페이지 {self.exact + self.near}개 "
+                f"(동일 {self.exact}, 유사 {self.near}) OCR 생략, 판정 {self.seconds:.2f}초")
+
+
+def find_blank_and_duplicates(reader, pdf_path: Path, use_raster: bool = True,
+                              blank_max_ink: float = BLANK_MAX_INK,
+                              near_max_distance: int = NEAR_MAX_DISTANCE) -> DedupResult:
+    """빈 페이지와 중복 페이지 판정
+
+    중복 묶음에서는 가장 앞 페이지를 원본으로 OCR하고 나머지는 원본 결과를 쓴다.
+    near_max_distance < 0이면 유사 중복 판정은 하지 않는다. 유사 중복 후보라도 두 페이지 모두
+    텍스트 레이어가 있는데 내용이 다르면 (문제 번호/숫자만 다른 페이지) 중복으로 보지 않는다.
+    """
+    t0 = time.time()
+    result = DedupResult()
+    prints = raster_fingerprints(pdf_path) if use_raster else None
+    if prints is not None and len(prints) != len(reader.pages):
+        print(f"[DEDUP] 래스터 페이지 수가 달라 래스터 판정 생략 ({len(prints)} != {len(reader.pages)})")
+        prints = None
+
+    by_digest: Dict[str, int] = {}
+    stream_digests: dict = {}
+    originals: List[int] = []   # 래스터 유사 비교 대상 (지금까지의 원본 페이지)
+    texts: Dict[int, str] = {}
+
+    def same_text(a: int, b: int) -> bool:
+        for idx in (a, b):
+            if idx not in texts:
+                texts[idx] = text_layer(reader.pages[idx])
+        return not texts[a] or not texts[b] or texts[a] == texts[b]
+    for page_idx, page in enumerate(reader.pages):
+        if is_empty_content(page) or (prints is not None and prints[page_idx][0] <= blank_max_ink):
+            result.blank.append(page_idx)
+            continue
+
+        digest = content_digest(page, stream_digests)
+        if digest is not None and digest in by_digest:
+            result.duplicates.setdefault(by_digest[digest], []).append(page_idx)
+            result.exact += 1
+            continue
+
+        original = None
+        if prints is not None and near_max_distance >= 0:
+            ink, h = prints[page_idx]
+            for cand in originals:
+                cand_ink, cand_h = prints[cand]
+                if abs(ink - cand_ink) <= NEAR_INK_TOLERANCE * max(ink, cand_ink) \
+                        and hamming(h, cand_h) <= near_max_distance and same_text(cand, page_idx):
+                    original = cand
+                    break
+        if original is not None:
+            result.duplicates.setdefault(original, []).append(page_idx)
+            result.near += 1
+            continue
+
+        if digest is not None:
+            by_digest[digest] = page_idx
+        originals.append(page_idx)
+
+    result.seconds = time.time() - t0
+    return result
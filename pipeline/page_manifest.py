@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+page_manifest.py - 페이지별 OCR 진행 상태 체크포인트
+result.paged.mmd 옆에 매니페스트(JSON)와 페이지별 mmd 파일을 남겨서,
+일부 페이지가 실패해도 이미 변환(과금)된 페이지는 다시 보내지 않고 이어서 처리한다.
+
+  <out_dir>/result.paged.manifest.json
+  <out_dir>/result.paged.pages/0001.mmd, 0002.mmd, ...
+
+페이지 상태: pending → uploaded(pdf_id 확보) → done | failed
+            skipped (OCR 전 판정으로 건너뜀, --resume 때는 다시 판정.
+                     단 --pages로 뺀 NOT_SELECTED는 다음 --pages 지정 전까지 유지)
+"""
+
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MANIFEST_VERSION = 1
+NOT_SELECTED = "NOT_SELECTED"  # --pages 범위 밖이라 건너뛴 페이지의 reason
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class PageManifest:
+    """페이지별 상태(pdf_id, status, mmd 경로)를 기록하는 매니페스트
+
+    상태가 바뀔 때마다 임시 파일에 쓴 뒤 rename하므로, 프로세스가 중간에 죽어도
+    매니페스트는 마지막으로 기록된 상태 그대로 남는다.
+    """
+
+    def __init__(self, path: Path, pages_dir: Path, source: str, source_sha256: str, num_pages: int):
+        self.path = Path(path)
+        self.pages_dir = Path(pages_dir)
+        self.source = source
+        self.source_sha256 = source_sha256
+        self.num_pages = num_pages
+        self.pages: Dict[str, dict] = {str(i + 1): {"status": "pending"} for i in range(num_pages)}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_output(cls, output_file: Path, pdf_path: Path, num_pages: int, resume: bool) -> "PageManifest":
+        """출력 파일 옆 매니페스트 열기
+
+        resume이면서 같은 원본 PDF(sha256 일치)의 매니페스트가 있으면 그 상태를 이어받고,
+        아니면 새로 시작한다.
+        """
+        stem = output_file.name[:-len(".mmd")] if output_file.name.endswith(".mmd") else output_file.name
+        path = output_file.with_name(f"{stem}.manifest.json")
+        pages_dir = output_file.with_name(f"{stem}.pages")
+        manifest = cls(path, pages_dir, pdf_path.name, file_sha256(pdf_path), num_pages)
+        if resume and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = None
+            if data and data.get("source_sha256") == manifest.source_sha256 \
+                    and data.get("num_pages") == num_pages:
+                manifest.pages.update(data.get("pages", {}))
+                # mmd 파일이 사라진 완료 페이지는 다시 처리, 건너뛴 페이지는 이번 실행에서 다시 판정
+                # (사용자가 범위에서 뺀 NOT_SELECTED 페이지는 판정이 아니라 선택이므로 그대로 둠)
+                for entry in manifest.pages.values():
+                    if entry.get("status") == "done" and not (manifest.path.parent / entry.get("mmd", "")).is_file():
+                        entry["status"] = "pending"
+                    elif entry.get("status") == "skipped" and entry.get("reason") != NOT_SELECTED:
+                        entry["status"] = "pending"
+            elif data:
+                print(f"[*] 매니페스트의 원본 PDF가 달라 처음부터 다시 변환합니다: {path}")
+        manifest.pages_dir.mkdir(parents=True, exist_ok=True)
+        manifest.save()
+        return manifest
+
+    def _write(self):
+        data = {
+            "version": MANIFEST_VERSION,
+            "source": self.source,
+            "source_sha256": self.source_sha256,
+            "num_pages": self.num_pages,
+            "pages": self.pages,
+        }
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def save(self):
+        with self._lock:
+            self._write()
+
+    def entry(self, page_idx: int) -> dict:
+        with self._lock:
+            return dict(self.pages[str(page_idx + 1)])
+
+    def _update(self, page_idx: int, **fields):
+        with self._lock:
+            self.pages[str(page_idx + 1)].update(fields)
+            self._write()
+
+    def _update_unless_done(self, page_idx: int, **fields):
+        """이미 완료된 페이지는 되돌리지 않음 (헤지 요청에서 늦게 끝난 쪽의 기록 무시)"""
+        with self._lock:
+            entry = self.pages[str(page_idx + 1)]
+            if entry.get("status") == "done":
+                return
+            entry.update(fields)
+            self._write()
+
+    def mark_uploaded(self, page_idx: int, pdf_id: str):
+        self._update_unless_done(page_idx, status="uploaded", pdf_id=pdf_id)
+
+    def mark_done(self, page_idx: int, mmd: str):
+        fp = self.pages_dir / f"{page_idx + 1:04d}.mmd"
+        fp.write_text(mmd, encoding="utf-8")
+        rel = fp.relative_to(self.path.parent).as_posix()
+        self._update(page_idx, status="done", mmd=rel, error=None)
+
+    def mark_failed(self, page_idx: int, error: str):
+        self._update_unless_done(page_idx, status="failed", error=str(error)[:500])
+
+    def mark_skipped(self, page_idx: int, reason: str):
+        self._update(page_idx, status="skipped", reason=reason)
+
+    def mark_pending(self, page_idx: int):
+        """건너뛴 페이지를 다시 처리 대상으로 (이전에 범위에서 뺀 페이지를 이번에 고른 경우)"""
+        self._update(page_idx, status="pending", reason=None)
+
+    def not_selected_pages(self) -> List[int]:
+        """--pages 범위 밖이라 건너뛴 페이지 인덱스(0-base) 목록"""
+        with self._lock:
+            return sorted(int(k) - 1 for k, v in self.pages.items()
+                          if v.get("status") == "skipped" and v.get("reason") == NOT_SELECTED)
+
+    def skipped_pages(self) -> List[int]:
+        with self._lock:
+            return sorted(int(k) - 1 for k, v in self.pages.items() if v.get("status") == "skipped")
+
+    def done_pages(self) -> List[int]:
+        """완료된 페이지 인덱스(0-base) 목록"""
+        with self._lock:
+            return sorted(int(k) - 1 for k, v in self.pages.items() if v.get("status") == "done")
+
+    def failed_pages(self) -> List[int]:
+        with self._lock:
+            return sorted(int(k) - 1 for k, v in self.pages.items() if v.get("status") == "failed")
+
+    def load_mmd(self, page_idx: int) -> Optional[str]:
+        entry = self.entry(page_idx)
+        if entry.get("status") != "done":
+            return None
+        return (self.path.parent / entry["mmd"]).read_text(encoding="utf-8")
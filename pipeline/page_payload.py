@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+page_payload.py - Mathpix에 올릴 단일 페이지 PDF 크기 줄이기
+PdfWriter.add_page로 떼어 낸 페이지는 원본 문서가 공유하는 리소스 사전(전체 폰트,
+큰 이미지 등)을 그대로 달고 나가서 페이지마다 업로드가 커진다.
+
+  1) 내용 스트림에서 쓰지 않는 리소스(/XObject, /Font, /ExtGState ...)는 복사하지 않음
+  2) 내용 스트림 재압축 (Flate)
+  3) (선택) 목표 DPI보다 큰 이미지 다운샘플링 (Pillow 필요)
+
+줄인 결과가 오히려 크면 원래 바이트를 그대로 쓴다.
+"""
+
+import io
+import re
+import threading
+from typing import Optional
+
+from pypdf import PdfWriter
+from pypdf.generic import DictionaryObject, NameObject
+
+RESOURCE_CATEGORIES = ("/XObject", "/Font", "/ExtGState", "/ColorSpace", "/Pattern", "/Shading", "/Properties")
+NAME_RX = re.compile(rb"/([^\s/\[\]()<>{}%]+)")
+
+DEFAULT_JPEG_QUALITY = 80
+
+
+def write_pdf(writer: PdfWriter) -> bytes:
+    bio = io.BytesIO()
+    writer.write(bio)
+    return bio.getvalue()
+
+
+def used_resource_names(page) -> Optional[set]:
+    """내용 스트림에 나오는 이름(/Im0, /F1 ...) 집합, 내용을 읽을 수 없으면 None"""
+    try:
+        contents = page.get_contents()
+        data = contents.get_data() if contents is not None else b""
+    except Exception:
+        return None
+    return {"/" + m.decode("latin-1") for m in NAME_RX.findall(data)}
+
+
+def clone_page_pruned(page, writer: PdfWriter):
+    """내용 스트림이 참조하는 리소스만 복사해서 writer에 페이지 추가, (새 페이지, 뺀 리소스 수) 반환
+
+    PdfWriter는 한 번 복사된 객체를 참조가 없어져도 그대로 쓰기 때문에,
+    복사한 뒤 지우는 대신 처음부터 쓰는 항목만 복사한다.
+    이름에 #xx 이스케이프가 있으면 비교가 애매하므로 남긴다.
+    """
+    used = used_resource_names(page)
+    resources = page.get("/Resources")
+    if used is None or resources is None:
+        return writer.add_page(page), 0
+    resources = resources.get_object()
+
+    new_page = writer.add_page(page, excluded_keys=("/Resources",))
+    pruned = DictionaryObject()
+    removed = 0
+    for key in resources:
+        value = resources.get(key)
+        if key in RESOURCE_CATEGORIES:
+            entries = DictionaryObject()
+            for name in value:
+                if name in used or "#" in name:
+                    entries[NameObject(name)] = value.raw_get(name).clone(writer)
+                else:
+                    removed += 1
+            pruned[NameObject(key)] = entries
+        else:
+            pruned[NameObject(key)] = resources.raw_get(key).clone(writer)
+    new_page[NameObject("/Resources")] = pruned
+    return new_page, removed
+
+
+def downsample_images(page, max_dpi: int, quality: int = DEFAULT_JPEG_QUALITY) -> int:
+    """페이지 크기 대비 max_dpi보다 해상도가 높은 이미지를 줄임, 바꾼 이미지 수 반환"""
+    from PIL import Image
+
+    width_in = float(page.mediabox.width) / 72
+    height_in = float(page.mediabox.height) / 72
+    if width_in <= 0 or height_in <= 0:
+        return 0
+    replaced = 0
+    for img in page.images:
+        try:
+            pil = img.image
+            dpi = max(pil.width / width_in, pil.height / height_in)
+            if dpi <= max_dpi:
+                continue
+            scale = max_dpi / dpi
+            size = (max(1, int(pil.width * scale)), max(1, int(pil.height * scale)))
+            if pil.mode not in ("L", "RGB"):
+                pil = pil.convert("RGB")
+            img.replace(pil.resize(size, Image.LANCZOS), quality=quality)
+            replaced += 1
+        except Exception as e:
+            print(f"[PAYLOAD] 이미지 {img.name} 다운샘플링 생략: {e}")
+    return replaced
+
+
+class PayloadOptimizer:
+    """페이지를 줄인 단일 페이지 PDF 바이트로 만들고 전후 크기를 기록 (스레드 안전)"""
+
+    def __init__(self, max_image_dpi: int = 0, jpeg_quality: int = DEFAULT_JPEG_QUALITY):
+        self.max_image_dpi = max_image_dpi
+        self.jpeg_quality = jpeg_quality
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.pages = 0
+        self._lock = threading.Lock()
+
+    def page_bytes(self, page_idx: int, page) -> bytes:
+        writer = PdfWriter()
+        writer.add_page(page)
+        before = write_pdf(writer)
+
+        try:
+            writer = PdfWriter()
+            new_page, _ = clone_page_pruned(page, writer)
+            if self.max_image_dpi > 0:
+                downsample_images(new_page, self.max_image_dpi, self.jpeg_quality)
+            new_page.compress_content_streams()
+            after = write_pdf(writer)
+        except Exception as e:
+            print(f"[PAYLOAD] page {page_idx + 1} 최적화 실패, 원본 사용: {e}")
+            after = before
+        if len(after) >= len(before):
+            after = before
+
+        with self._lock:
+            self.pages += 1
+            self.bytes_before += len(before)
+            self.bytes_after += len(after)
+        print(f"[PAYLOAD] page {page_idx + 1}: {len(before) / 1024:.0f}KB → {len(after) / 1024:.0f}KB")
+        return after
+
+    def summary(self) -> str:
+        saved = self.bytes_before - self.bytes_after
+        ratio = saved / self.bytes_before * 100 if self.bytes_before else 0.0
+        return (f"페이지 {self.pages}개, 업로드 {self.bytes_before / 1048576:.1f}MB → "
+                f"{self.bytes_after / 1048576:.1f}MB ({ratio:.0f}% 감소)")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+page_stream.py - 페이지 단위 OCR 결과 스트림 (JSONL)
+convert_pdf.py --stream은 페이지가 끝나는 대로(완료 순서대로) 한 줄씩 덧붙이고,
+후속 단계는 follow_pages()로 1페이지부터 이어진 구간이 준비되는 즉시 순서대로 읽는다.
+
+  {"num_pages": 40, "source": "book.pdf"}     ← 첫 줄 (헤더)
+  {"page": 3, "mmd": "..."}                   ← 완료된 페이지 (순서 무관)
+  {"page": 5, "skipped": true}                ← OCR 하지 않은 페이지
+  {"done": true}                              ← 마지막 줄 (실패 시 "error" 포함)
+"""
+
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+STREAM_NAME = "result.paged.jsonl"
+
+
+class PageStreamWriter:
+    """완료된 페이지를 JSONL로 덧붙이는 writer (스레드 안전, 줄마다 flush)"""
+
+    def __init__(self, path: Path, num_pages: int, source: str = ""):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._f = open(self.path, "w", encoding="utf-8")
+        self._emit({"num_pages": num_pages, "source": source})
+
+    def _emit(self, record: dict):
+        with self._lock:
+            self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._f.flush()
+
+    def write_page(self, page_idx: int, mmd: str):
+        self._emit({"page": page_idx + 1, "mmd": mmd})
+
+    def skip_page(self, page_idx: int):
+        self._emit({"page": page_idx + 1, "skipped": True})
+
+    def close(self, error: Optional[str] = None):
+        if self._f.closed:
+            return
+        record = {"done": True}
+        if error:
+            record["error"] = str(error)[:500]
+        self._emit(record)
+        with self._lock:
+            self._f.close()
+
+
+def follow_pages(path: Path, poll_interval: float = 0.2,
+                 idle_timeout: float = 600.0) -> Iterator[Tuple[int, Optional[str]]]:
+    """스트림을 따라가며 (page_no, mmd)를 1페이지부터 순서대로 생성
+
+    아직 안 끝난 앞 페이지가 있으면 뒤 페이지는 버퍼에 두었다가 구간이 이어질 때 내보낸다.
+    건너뛴 페이지는 mmd=None으로 내보낸다. 스트림이 error로 끝나면 받은 페이지까지
+    내보낸 뒤 RuntimeError를 던진다. idle_timeout초 동안 새 줄이 없으면 TimeoutError.
+    """
+    path = Path(path)
+    deadline = time.time() + idle_timeout
+    while not path.exists():
+        if time.time() > deadline:
+            raise TimeoutError(f"스트림 파일이 생기지 않음: {path}")
+        time.sleep(poll_interval)
+
+    buffered = {}
+    next_page = 1
+    with open(path, "r", encoding="utf-8") as f:
+        partial = ""
+        while True:
+            line = f.readline()
+            if not line.endswith("\n"):
+                # 쓰는 중인 줄 → 다음에 마저 읽기
+                partial += line
+                if time.time() > deadline:
+                    raise TimeoutError(f"스트림 갱신 없음 ({idle_timeout:.0f}초): {path}")
+                time.sleep(poll_interval)
+                continue
+            line, partial = partial + line, ""
+            deadline = time.time() + idle_timeout
+            record = json.loads(line)
+
+            if "page" in record:
+                buffered[record["page"]] = None if record.get("skipped") else record.get("mmd", "")
+                while next_page in buffered:
+                    yield next_page, buffered.pop(next_page)
+                    next_page += 1
+            elif record.get("done"):
+                # 중간에 빠진 페이지(실패 등)가 있으면 남은 페이지를 순서대로 내보냄
+                for page_no in sorted(buffered):
+                    yield page_no, buffered[page_no]
+                if record.get("error"):
+                    raise RuntimeError(f"OCR 스트림이 오류로 끝남: {record['error']}")
+                return
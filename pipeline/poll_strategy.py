@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+poll_strategy.py - Mathpix 변환 상태 폴링 간격 조절
+페이지 크기 구간별로 실제 처리 시간을 학습해서,
+예상 완료 시점 근처에서는 촘촘히 묻고 그 이후로는 지수 백오프(+지터)로 간격을 벌린다.
+"""
+
+import os
+import json
+import random
+import threading
+from pathlib import Path
+from typing import Iterator, Optional
+
+DEFAULT_STATS_PATH = "cache/poll_stats.json"
+
+
+class AdaptivePoller:
+    """페이지 크기별 처리 시간 EWMA를 기반으로 폴링 간격을 정하는 전략
+
+    - 구간(bucket): 페이지 PDF 바이트 수의 bit_length (2배 단위 크기 구간)
+    - 첫 폴링: 예상 처리 시간의 80% 시점
+    - 예상 시간의 (1 + near_window)배까지: min_interval 간격
+    - 그 이후: min_interval부터 두 배씩, max_interval 상한, [d/2, d] 범위 지터
+    """
+
+    def __init__(self, stats_path: Optional[Path] = None, min_interval: float = 0.5,
+                 max_interval: float = 15.0, default_expected: float = 4.0,
+                 near_window: float = 0.25, alpha: float = 0.3):
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_expected = default_expected
+        self.near_window = near_window
+        self.alpha = alpha
+        self.model = {}  # bucket(str) -> {"ewma": 초, "n": 샘플 수}
+        self.total_polls = 0
+        self.pages = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def bucket(size: int) -> str:
+        return str(max(int(size), 1).bit_length())
+
+    def _load(self):
+        if not self.stats_path or not self.stats_path.exists():
+            return
+        try:
+            self.model = json.loads(self.stats_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.model = {}
+
+    def save(self):
+        """학습된 처리 시간을 다음 실행에서 쓰도록 저장
+
+        여러 변환 프로세스가 같은 파일에 쓰므로 임시 파일 이름은 프로세스/스레드마다 다르게 하고,
+        저장에 실패해도 변환 결과에는 영향이 없도록 기록만 남긴다.
+        """
+        if not self.stats_path:
+            return
+        with self._lock:
+            data = json.dumps(self.model, ensure_ascii=False, indent=2)
+        tmp = self.stats_path.with_name(f"{self.stats_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, self.stats_path)
+        except OSError as e:
+            print(f"[POLL] 폴링 통계 저장 실패 (무시): {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    def expected(self, size: int) -> float:
+        """해당 크기 페이지의 예상 처리 시간(초)
+
+        같은 구간 기록이 없으면 가장 가까운 구간 값, 그것도 없으면 기본값을 쓴다.
+        """
+        with self._lock:
+            if not self.model:
+                return self.default_expected
+            b = int(self.bucket(size))
+            nearest = min(self.model, key=lambda k: abs(int(k) - b))
+            return self.model[nearest]["ewma"]
+
+    def delays(self, size: int) -> Iterator[float]:
+        """다음 폴링까지 기다릴 시간(초)을 차례로 생성 (첫 값은 업로드 직후 대기)"""
+        expected = self.expected(size)
+        first = max(self.min_interval, expected * 0.8)
+        yield first
+        elapsed = first
+        backoff = self.min_interval
+        while True:
+            if elapsed < expected * (1 + self.near_window):
+                d = self.min_interval
+            else:
+                backoff = min(self.max_interval, backoff * 2)
+                d = random.uniform(backoff / 2, backoff)
+            elapsed += d
+            yield d
+
+    def record(self, size: int, seconds: float, polls: int):
+        """완료된 페이지의 처리 시간과 폴링 횟수 반영"""
+        b = self.bucket(size)
+        with self._lock:
+            self.total_polls += polls
+            self.pages += 1
+            entry = self.model.get(b)
+            if entry is None:
+                self.model[b] = {"ewma": seconds, "n": 1}
+            else:
+                entry["ewma"] = (1 - self.alpha) * entry["ewma"] + self.alpha * seconds
+                entry["n"] += 1
+
+    def record_done(self, size: int, started: float, last_pending: Optional[float], done_at: float, polls: int):
+        """상태 조회로 완료를 확인한 페이지 반영
+
+        실제 완료 시점은 마지막 '처리 중' 조회(last_pending)와 완료 조회(done_at) 사이 → 중간값으로 학습.
+        첫 조회에서 이미 끝났으면 앞선 관측이 없어 중간값이 짧게 치우치므로(빠른 페이지마다
+        예상 시간이 계속 줄어듦) 상한인 done_at - started를 쓴다.
+        """
+        if last_pending is None:
+            seconds = done_at - started
+        else:
+            seconds = (last_pending + done_at) / 2 - started
+        self.record(size, seconds, polls)
+
+    def summary(self) -> str:
+        avg = self.total_polls / self.pages if self.pages else 0.0
+        return f"페이지 {self.pages}개, 상태 조회 총 {self.total_polls}회 (페이지당 평균 {avg:.1f}회)"
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+rate_limit.py - 여러 convert_pdf.py 프로세스가 함께 쓰는 Mathpix 요청 토큰 버킷
+app.cjs가 업로드마다 변환 프로세스를 따로 띄우므로, 프로세스 안의 제한만으로는
+전체 요청량을 묶을 수 없다. 버킷 상태를 호스트 공용 파일(또는 MongoDB)에 두고
+모든 프로세스가 요청 전에 토큰을 하나씩 받아 간다.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+DEFAULT_RATE = 10.0   # 초당 요청 수
+DEFAULT_BURST = 20    # 버킷 최대 토큰
+DEFAULT_STATE_PATH = Path(tempfile.gettempdir()) / "mathpix_rate_bucket.json"
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class _TokenBucket:
+    """try_acquire()만 구현하면 동기/비동기 대기는 공통으로 처리"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.waited = 0.0
+        self.acquired = 0
+        self._stats_lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """토큰을 받으면 0, 아니면 다시 시도하기까지 기다릴 초"""
+        raise NotImplementedError
+
+    def _count(self, wait: float):
+        with self._stats_lock:
+            if wait <= 0:
+                self.acquired += 1
+            else:
+                self.waited += wait
+
+    def acquire(self):
+        while True:
+            wait = self.try_acquire()
+            self._count(wait)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        # try_acquire는 파일 잠금/DB 요청으로 블로킹하므로 이벤트 루프 밖에서 실행
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire)
+            self._count(wait)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def summary(self) -> str:
+        return f"요청 {self.acquired}회, 제한 대기 누적 {self.waited:.1f}초 (초당 {self.rate:g}회, 버스트 {self.burst:g})"
+
+
+class FileTokenBucket(_TokenBucket):
+    """호스트 공용 상태 파일 + 파일 잠금으로 구현한 토큰 버킷 (단일 서버용)"""
+
+    def __init__(self, path: Path = DEFAULT_STATE_PATH, rate: float = DEFAULT_RATE,
+                 burst: float = DEFAULT_BURST):
+        super().__init__(rate, burst)
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(self.path.suffix + ".lock")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _locked(self):
+        return _FileLock(self.lock_path)
+
+    def try_acquire(self) -> float:
+        with self._locked():
+            now = time.time()
+            try:
+                state = json.loads(self.path.read_text(encoding="utf-8"))
+                tokens = _refill(state["tokens"], state["updated"], now, self.rate, self.burst)
+            except (OSError, ValueError, KeyError):
+                tokens = self.burst
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            self.path.write_text(json.dumps({"tokens": tokens, "updated": now}), encoding="utf-8")
+            return wait
+
+
+class MongoTokenBucket(_TokenBucket):
+    """MongoDB 문서 하나로 공유하는 토큰 버킷 (여러 서버가 같은 한도를 나눠 쓸 때)
+
+    문서의 updated 값을 조건으로 갱신하는 낙관적 잠금을 쓰고, 경쟁에서 지면 바로 재시도한다.
+    """
+
+    def __init__(self, uri: str, database: str, name: str = "mathpix",
+                 rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST):
+        super().__init__(rate, burst)
+        from pymongo import MongoClient
+        from pymongo.errors import DuplicateKeyError
+        self._duplicate_key_error = DuplicateKeyError
+        self.client = MongoClient(uri)
+        self.coll = self.client[database]["rate_limits"]
+        self.name = name
+
+    def try_acquire(self) -> float:
+        while True:
+            now = time.time()
+            doc = self.coll.find_one({"_id": self.name})
+            if doc is None:
+                try:
+                    self.coll.insert_one({"_id": self.name, "tokens": self.burst - 1, "updated": now})
+                    return 0.0
+                except self._duplicate_key_error:
+                    continue  # 다른 프로세스가 먼저 만듦
+            tokens = _refill(doc["tokens"], doc["updated"], now, self.rate, self.burst)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            res = self.coll.update_one(
+                {"_id": self.name, "updated": doc["updated"]},
+                {"$set": {"tokens": tokens, "updated": now}},
+            )
+            if res.modified_count == 1:
+                return wait
+
+
+class _FileLock:
+    """프로세스 간 배타 잠금 (POSIX: fcntl, Windows: msvcrt)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o666)
+        if sys.platform == "win32":
+            import msvcrt
+            os.lseek(self.fd, 0, os.SEEK_SET)
+            while True:
+                try:
+                    msvcrt.locking(self.fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if sys.platform == "win32":
+            import msvcrt
+            os.lseek(self.fd, 0, os.SEEK_SET)
+            msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+
+def make_rate_limiter(backend: str, rate: float, burst: float):
+    """backend: file | mongo | none"""
+    if backend == "none" or rate <= 0:
+        return None
+    if backend == "mongo":
+        uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+        database = os.getenv("MONGODB_DATABASE", "ZeroTyping")
+        return MongoTokenBucket(uri, database, rate=rate, burst=burst)
+    state_path = Path(os.getenv("MATHPIX_RATE_FILE", str(DEFAULT_STATE_PATH)))
+    return FileTokenBucket(state_path, rate=rate, burst=burst)
@@ -2,17 +2,24 @@
 # 기존 호출 방식과 호환되도록 수정된 버전
 
 from pathlib import Path
+import os
 import re
 import sys
 import json
 import argparse
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List
+from job_workspace import add_job_args, resolve_job_dir
+from line_store import LineStore, PAGE_MARK_RX, strip_invisible
 
 # =============================================================================
 # 정규식 패턴 정의 섹션
 # =============================================================================
 
-# 페이지 마크 패턴: "<<<PAGE 1>>>", "<<<PAGE 2>>>" 등의 형태를 감지
-PAGE_MARK = re.compile(r"^<<<PAGE\s+(\d+)\s*>>>$")
+# 페이지 마크 패턴: "<<<PAGE 1>>>", "<<<PAGE 2>>>" 등의 형태를 감지 (filter_pages.py와 공용)
+PAGE_MARK = PAGE_MARK_RX
 
 # 문항 시작 패턴: 다양한 형태의 문항 번호를 감지
 # 소문제(17.1, 17.2 등)는 별도 문제로 인식하지 않음
@@ -114,19 +121,82 @@ SCORE_BRACKET_RX = re.compile(
 # 표 패턴: LaTeX 표 환경을 감지
 TABLE_RX = re.compile(r'\\begin\{tabular\}|\\end\{tabular\}|^\s*\\hline|^\s*&.*&')
 
-# 보이지 않는 문자 패턴: 유니코드의 보이지 않는 문자들을 감지
-INVIS_RX = re.compile(r"[\u200B-\u200F\u202A-\u202E\u2060\u2066-\u2069\uFEFF\u00A0]")
+# 수식 환경 패턴: 한 줄 전체가 \[, \], aligned 시작/끝, & ... & 인 경우
+MATH_ENV_RX = re.compile(r"^(?:\\\[|\\\]|\\begin\{aligned\}|\\end\{aligned\}|&.*&)$")
+
+# 마지막 선지 패턴: (5) 또는 （5）
+LAST_CHOICE_RX = re.compile(r'\(5\)|（5）')
+
+# 조건 키워드 패턴: 종료 신호 줄에 있으면 뒤따르는 조건/보기를 문항에 포함
+CONDITION_KEYWORD_RX = re.compile(
+    r'다음\s+조건'
+    r'|'
+    r'조건을\s+만족'
+    r'|'
+    r'아래\s+조건'
+)
+
+# 줄 특징 비트: 문서의 줄마다 위 정규식을 한 번씩만 돌려 array에 저장하고,
+# 종료 줄 탐색은 종료 신호마다 정규식을 다시 돌리는 대신 비트만 확인한다.
+F_PAGE_MARK = 1 << 0      # PAGE_MARK
+F_QUESTION = 1 << 1       # QUESTION_RX (문항 시작)
+F_END_SIGNAL = 1 << 2     # 종료 신호 (QUESTION_END_RX, 이미지/선지 줄 제외)
+F_CONDITION_KW = 1 << 3   # CONDITION_KEYWORD_RX
+F_ADDITIONAL = 1 << 4     # ADDITIONAL_CONDITION_RX
+F_SCORE = 1 << 5          # SCORE_BRACKET_RX
+F_VIEW = 1 << 6           # VIEW_TOKEN_RX
+F_IMAGE = 1 << 7          # IMAGE_LINK_RX
+F_CHOICE = 1 << 8         # CHOICE_LINE_RX
+F_LAST_CHOICE = 1 << 9    # LAST_CHOICE_RX
+F_TABLE = 1 << 10         # TABLE_RX
+F_MATH_ENV = 1 << 11      # MATH_ENV_RX
+F_NONEMPTY = 1 << 12      # 내용이 있는 줄
 
 # =============================================================================
 # 유틸리티 함수 섹션
 # =============================================================================
 
+def classify_line(det: str) -> int:
+    """감지용 정규화 줄 하나의 특징 비트"""
+    if not det:
+        return 0
+    if PAGE_MARK.match(det):
+        return F_PAGE_MARK | F_NONEMPTY
+    f = F_NONEMPTY
+    if QUESTION_RX.match(det):
+        f |= F_QUESTION
+    if CHOICE_LINE_RX.match(det):
+        f |= F_CHOICE
+        if LAST_CHOICE_RX.search(det):
+            f |= F_LAST_CHOICE
+    if IMAGE_LINK_RX.search(det):
+        f |= F_IMAGE
+    if QUESTION_END_RX.search(det) and not f & F_IMAGE:
+        if not (f & F_CHOICE and not f & F_QUESTION):
+            f |= F_END_SIGNAL
+    if CONDITION_KEYWORD_RX.search(det):
+        f |= F_CONDITION_KW
+    if ADDITIONAL_CONDITION_RX.search(det):
+        f |= F_ADDITIONAL
+    # 배점 패턴은 모두 '점'을, 줄 중간에서 맞는 보기 패턴은 모두 '보'를 포함하므로
+    # 없는 줄은 비싼 search를 건너뛴다 (줄 머리 패턴은 match로 확인)
+    if "점" in det and SCORE_BRACKET_RX.search(det):
+        f |= F_SCORE
+    if VIEW_TOKEN_RX.match(det) or ("보" in det and VIEW_TOKEN_RX.search(det)):
+        f |= F_VIEW
+    if TABLE_RX.match(det):
+        f |= F_TABLE
+    if MATH_ENV_RX.match(det):
+        f |= F_MATH_ENV
+    return f
+
+def line_features(store: LineStore) -> array:
+    """문서 전체 줄의 특징 비트 배열 (store.det와 같은 인덱스)"""
+    return array("H", map(classify_line, store.det))
+
 def norm_for_detection(line: str) -> str:
-    """텍스트 줄을 패턴 감지용으로 정규화하는 함수"""
-    if not line:
-        return ""
-    line = INVIS_RX.sub("", line)
-    return line.strip()
+    """텍스트 줄을 패턴 감지용으로 정규화하는 함수 (LineStore.det와 같은 정규화)"""
+    return strip_invisible(line)
 
 def safe_preview(text: str, limit: int = 80) -> str:
     """텍스트를 안전하게 미리보기용으로 자르는 함수"""
@@ -140,36 +210,100 @@ def safe_preview(text: str, limit: int = 80) -> str:
     except UnicodeEncodeError:
         return snippet.encode("unicode_escape").decode()
 
+# =============================================================================
+# 트레이스 로그 섹션
+# =============================================================================
+
+TRACE_LEVELS = {"off": 0, "info": 1, "debug": 2}
+TRACE_LEVEL_NAMES = {v: k for k, v in TRACE_LEVELS.items()}
+DEFAULT_TRACE_RING = 500
+
+class SplitTracer:
+    """분할 판단 기록 (줄마다 print 대신)
+
+    - info: 시작/종료줄 발견, 상태 전이, 문제별 결과
+    - debug: find_actual_end_line의 줄 단위 판단 ([DEBUG])
+    level 이하의 기록만 바로 출력하고, 모든 기록은 마지막 ring_size개를 메모리에 남겨
+    실패했을 때 dump()로 출력한다. 메시지는 출력할 때만 만든다 (기록은 틀과 인자만 보관).
+    path를 주면 모든 기록을 JSONL로 남긴다.
+    """
+
+    def __init__(self, level: str = "off", ring_size: int = DEFAULT_TRACE_RING, path: Path = None):
+        self.level = TRACE_LEVELS[level]
+        self.ring = deque(maxlen=ring_size)
+        self.count = 0
+        self.path = path
+        self._file = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, "w", encoding="utf-8")
+
+    @staticmethod
+    def _format(fmt: str, args: tuple, escape: bool = True) -> str:
+        if escape:
+            args = tuple(safe_preview(a, len(a)) if isinstance(a, str) else a for a in args)
+        return fmt.format(*args)
+
+    def _record(self, level: int, fmt: str, args: tuple):
+        self.count += 1
+        self.ring.append((level, fmt, args))
+        if level <= self.level:
+            print(self._format(fmt, args))
+        if self._file:
+            msg = self._format(fmt, args, escape=False).strip()
+            if msg.startswith("[DEBUG] "):
+                msg = msg[len("[DEBUG] "):]
+            self._file.write(json.dumps({
+                "seq": self.count, "level": TRACE_LEVEL_NAMES[level], "msg": msg,
+            }, ensure_ascii=False) + "\n")
+
+    def info(self, fmt: str, *args):
+        self._record(TRACE_LEVELS["info"], fmt, args)
+
+    def debug(self, fmt: str, *args):
+        self._record(TRACE_LEVELS["debug"], fmt, args)
+
+    def dump(self, reason: str):
+        """메모리에 남은 마지막 판단들 출력 (실패 원인 확인용)"""
+        print(f"[TRACE] {reason}: 마지막 판단 {len(self.ring)}개 (전체 {self.count}개)")
+        for level, fmt, args in self.ring:
+            print(self._format(fmt, args))
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            print(f"[TRACE] 판단 {self.count}개 기록: {self.path}")
+
+# 기본은 출력 없이 링 버퍼에만 기록 (main에서 옵션에 따라 다시 만듦)
+TRACE = SplitTracer()
+
 # =============================================================================
 # 핵심 처리 함수 섹션
 # =============================================================================
 
-def find_actual_end_line(lines, signal_line, current_page, start_signals, end_signals):
-    """종료 신호 이후 추가 조건들을 확인하여 실제 종료 줄을 찾는 핵심 함수"""
-    N = len(lines)
-    j = signal_line
+def find_actual_end_line(store: LineStore, signal_line, current_page, start_signals, end_signals,
+                         features: array = None):
+    """종료 신호 이후 추가 조건들을 확인하여 실제 종료 줄을 찾는 핵심 함수
 
-    # 종료 신호 줄 자체에 조건 키워드가 있는지 확인
-    signal_det = norm_for_detection(lines[signal_line - 1].rstrip('\n'))
-    CONDITION_KEYWORD_RX = re.compile(
-        r'다음\s+조건'
-        r'|'
-        r'조건을\s+만족'
-        r'|'
-        r'아래\s+조건'
-    )
+    features는 line_features(store) 결과, 없으면 여기서 만든다 (여러 번 부를 때는 넘겨서 재사용).
+    """
+    if features is None:
+        features = line_features(store)
+    N = len(store)
+    j = signal_line
 
     # 종료 신호에 조건 키워드가 있으면 기본적으로 추가 내용 상태로 시작
-    in_additional_content = bool(CONDITION_KEYWORD_RX.search(signal_det))
+    in_additional_content = bool(features[signal_line - 1] & F_CONDITION_KW)
     if in_additional_content:
-        print(f"    [DEBUG] 종료 신호에 조건 키워드 감지, 추가 내용 상태로 시작: 줄 {signal_line}")
+        TRACE.debug("    [DEBUG] 종료 신호에 조건 키워드 감지, 추가 내용 상태로 시작: 줄 {}", signal_line)
 
     last_choice_line_index = None
     last_subquestion_line_index = None
     last_additional_line_index = None
 
     if signal_line == 1:
-        print(f"    [DEBUG] 페이지 첫 번째 줄에서 종료 신호, 해당 줄이 종료줄: {signal_line}")
+        TRACE.debug("    [DEBUG] 페이지 첫 번째 줄에서 종료 신호, 해당 줄이 종료줄: {}", signal_line)
         return signal_line - 1
 
     # 다음 시작신호/종료신호 찾기 (탐색 범위 제한)
@@ -195,141 +329,164 @@ def find_actual_end_line(lines, signal_line, current_page, start_signals, end_si
         max_search_line = next_end_line
 
     while j < max_search_line:
-        line = lines[j].rstrip("\n")
-        det = norm_for_detection(line)
+        det = store.det[j]
+        f = features[j]
 
-        if PAGE_MARK.match(det):
-            print(f"    [DEBUG] 페이지 변경 감지, 중단: 줄 {j+1}")
+        if f & F_PAGE_MARK:
+            TRACE.debug("    [DEBUG] 페이지 변경 감지, 중단: 줄 {}", j+1)
             break
 
-        if QUESTION_RX.match(det):
-            print(f"    [DEBUG] 다음 문항 시작 신호 감지, 중단: 줄 {j+1}")
+        if f & F_QUESTION:
+            TRACE.debug("    [DEBUG] 다음 문항 시작 신호 감지, 중단: 줄 {}", j+1)
             break
 
         has_additional_content = False
 
-        if ADDITIONAL_CONDITION_RX.search(det):
+        if f & F_ADDITIONAL:
             has_additional_content = True
             last_additional_line_index = j
-            print(f"    [DEBUG] 추가 조건 감지: 줄 {j+1}: {safe_preview(det, 50)}...")
+            TRACE.debug("    [DEBUG] 추가 조건 감지: 줄 {}: {}...", j+1, det[:50])
 
-        if SCORE_BRACKET_RX.search(det):
+        if f & F_SCORE:
             has_additional_content = True
             in_additional_content = True
             last_additional_line_index = j
-            print(f"    [DEBUG] 배점 감지: 줄 {j+1}: {safe_preview(det, 50)}...")
+            TRACE.debug("    [DEBUG] 배점 감지: 줄 {}: {}...", j+1, det[:50])
 
-        if VIEW_TOKEN_RX.search(det):
+        if f & F_VIEW:
             has_additional_content = True
             in_additional_content = True
             last_additional_line_index = j
-            print(f"    [DEBUG] 보기 감지: 줄 {j+1}: {safe_preview(det, 50)}...")
+            TRACE.debug("    [DEBUG] 보기 감지: 줄 {}: {}...", j+1, det[:50])
 
-        if IMAGE_LINK_RX.search(det):
+        if f & F_IMAGE:
             has_additional_content = True
             in_additional_content = True
             last_additional_line_index = j
-            print(f"    [DEBUG] 이미지 링크 감지: 줄 {j+1}: {safe_preview(det, 50)}...")
+            TRACE.debug("    [DEBUG] 이미지 링크 감지: 줄 {}: {}...", j+1, det[:50])
 
-        if CHOICE_LINE_RX.match(det):
+        if f & F_CHOICE:
             # (1)~(5) 패턴 발견 시 무조건 추가 내용으로 포함
             has_additional_content = True
             in_additional_content = True
             last_choice_line_index = j
             last_additional_line_index = j
-            print(f"    [DEBUG] (1)~(5) 패턴 감지 (선지/소문제): 줄 {j+1}: {safe_preview(det, 50)}...")
+            TRACE.debug("    [DEBUG] (1)~(5) 패턴 감지 (선지/소문제): 줄 {}: {}...", j+1, det[:50])
 
             # (5) 패턴 발견 시 즉시 종료 (선지의 마지막)
             # 단, 다음 줄이 이미지인 경우 이미지까지만 포함
-            if re.search(r'\(5\)|（5）', det):
+            if f & F_LAST_CHOICE:
                 # 다음 줄이 이미지인지 확인
                 if j + 1 < N:
-                    next_line = lines[j + 1].rstrip('\n')
-                    next_det = norm_for_detection(next_line)
-
                     # 다음 줄이 이미지면 하나만 더 포함
-                    if IMAGE_LINK_RX.search(next_det):
-                        print(f"    [DEBUG] (5) 패턴 후 이미지 감지, 이미지 포함: 줄 {j+2}")
+                    if features[j + 1] & F_IMAGE:
+                        TRACE.debug("    [DEBUG] (5) 패턴 후 이미지 감지, 이미지 포함: 줄 {}", j+2)
                         return j + 1  # 이미지까지 포함 (0-based)
 
                 # 이미지 아니면 즉시 종료
-                print(f"    [DEBUG] (5) 패턴 발견, 즉시 종료: 줄 {j+1}")
+                TRACE.debug("    [DEBUG] (5) 패턴 발견, 즉시 종료: 줄 {}", j+1)
                 return j
 
-        if TABLE_RX.match(det):
+        if f & F_TABLE:
             has_additional_content = True
             in_additional_content = True
             last_additional_line_index = j
-            print(f"    [DEBUG] 표 감지: 줄 {j+1}: {safe_preview(det, 50)}...")
+            TRACE.debug("    [DEBUG] 표 감지: 줄 {}: {}...", j+1, det[:50])
 
-        if re.match(r"^(?:\\\[|\\\]|\\begin\{aligned\}|\\end\{aligned\}|&.*&)$", det):
+        if f & F_MATH_ENV:
             has_additional_content = True
             in_additional_content = True
             last_additional_line_index = j
-            print(f"    [DEBUG] 수식 환경 감지: 줄 {j+1}: {safe_preview(det, 50)}...")
+            TRACE.debug("    [DEBUG] 수식 환경 감지: 줄 {}: {}...", j+1, det[:50])
 
         if has_additional_content:
             in_additional_content = True
 
         if in_additional_content:
-            if det.strip():
+            if f & F_NONEMPTY:
                 last_additional_line_index = j
-            print(f"    [DEBUG] 추가 내용 상태 유지, 계속 진행: 줄 {j+1}")
+            TRACE.debug("    [DEBUG] 추가 내용 상태 유지, 계속 진행: 줄 {}", j+1)
             j += 1
             continue
 
-        if det.strip() and not has_additional_content:
+        if f & F_NONEMPTY and not has_additional_content:
             candidates = [idx for idx in (last_choice_line_index, last_subquestion_line_index, last_additional_line_index) if idx is not None]
             if candidates:
-                print(f"    [DEBUG] 추가 내용 발견, 마지막 추가 내용 줄을 종료줄로 사용: {max(candidates) + 1}")
+                TRACE.debug("    [DEBUG] 추가 내용 발견, 마지막 추가 내용 줄을 종료줄로 사용: {}", max(candidates) + 1)
                 return max(candidates)
-            print(f"    [DEBUG] 추가 내용 없음, 종료 신호 줄이 종료줄: {signal_line}")
+            TRACE.debug("    [DEBUG] 추가 내용 없음, 종료 신호 줄이 종료줄: {}", signal_line)
             return signal_line - 1
 
-        print(f"    [DEBUG] 줄 {j+1}: has_content={has_additional_content}, in_content={in_additional_content}, det='{safe_preview(det, 30)}...'")
+        TRACE.debug("    [DEBUG] 줄 {}: has_content={}, in_content={}, det='{}...'", j+1, has_additional_content, in_additional_content, det[:30])
         j += 1
 
     if last_additional_line_index is not None:
-        print(f"    [DEBUG] 페이지 끝, 마지막 추가 내용 줄을 종료줄로 사용: {last_additional_line_index + 1}")
+        TRACE.debug("    [DEBUG] 페이지 끝, 마지막 추가 내용 줄을 종료줄로 사용: {}", last_additional_line_index + 1)
         return last_additional_line_index
     if in_additional_content:
-        print(f"    [DEBUG] 페이지 끝, 추가 내용 상태에서 종료: {j}")
+        TRACE.debug("    [DEBUG] 페이지 끝, 추가 내용 상태에서 종료: {}", j)
         return j - 1
-    print(f"    [DEBUG] 페이지 끝, 추가 내용 없음, 종료 신호 줄이 종료줄: {signal_line}")
+    TRACE.debug("    [DEBUG] 페이지 끝, 추가 내용 없음, 종료 신호 줄이 종료줄: {}", signal_line)
     return signal_line - 1
 
-def calculate_problems_with_algorithm(input_file: Path):
-    """시작 줄과 종료 줄 정보를 바탕으로 문제 분할 알고리즘을 적용하는 핵심 함수"""
-    print(f"\n=== 알고리즘으로 문제 분할 계산 ===")
-    
-    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
-        lines = f.readlines()
-    
+@dataclass
+class SignalIndex:
+    """문서를 한 번 훑어 모은 시작/종료 신호 (분할과 JSON 저장이 같이 씀)
+
+    start_lines/end_lines는 1-base 줄 번호, end_lines는 find_actual_end_line으로 확정한 종료줄.
+    *_pages는 신호가 나온 페이지.
+    """
+    start_lines: List[int] = field(default_factory=list)
+    start_pages: List[int] = field(default_factory=list)
+    end_lines: List[int] = field(default_factory=list)
+    end_pages: List[int] = field(default_factory=list)
+
+    @property
+    def start_set(self) -> set:
+        return set(self.start_lines)
+
+    @property
+    def end_set(self) -> set:
+        return set(self.end_lines)
+
+def build_signal_index(store: LineStore) -> SignalIndex:
+    """모든 줄에 신호 정규식을 한 번씩만 돌려 시작줄/종료줄/페이지를 수집"""
+    print(f"\n=== 시작/종료 신호 수집 (분할과 JSON 저장에 같이 사용) ===")
     print("1단계: 시작 줄과 종료 줄 정보 수집")
-    start_lines = []
-    end_lines = []
-    current_page = 1
+    index = SignalIndex()
+    features = line_features(store)
     
-    for i, line in enumerate(lines, 1):
-        line = line.rstrip('\n')
-        det = norm_for_detection(line)
-        
-        page_match = PAGE_MARK.match(det)
-        if page_match:
-            current_page = int(page_match.group(1))
+    for i, f in enumerate(features, 1):
+        if f & F_PAGE_MARK:
             continue
+        current_page = store.page_no[i - 1]
         
-        if QUESTION_RX.match(det):
-            start_lines.append(i)
-            print(f"  시작줄 발견: 줄 {i}")
+        if f & F_QUESTION:
+            index.start_lines.append(i)
+            index.start_pages.append(current_page)
+            TRACE.info("  시작줄 발견: 줄 {}", i)
         
-        if QUESTION_END_RX.search(det) and not IMAGE_LINK_RX.search(det):
-            if not (CHOICE_LINE_RX.match(det) and not QUESTION_RX.match(det)):
-                actual_end_line = find_actual_end_line(lines, i, current_page, [], [])
-                end_lines.append(actual_end_line + 1)
-                print(f"  종료줄 발견: 줄 {actual_end_line + 1} (신호: {i})")
+        if f & F_END_SIGNAL:
+            actual_end_line = find_actual_end_line(store, i, current_page, [], [], features)
+            index.end_lines.append(actual_end_line + 1)
+            index.end_pages.append(current_page)
+            TRACE.info("  종료줄 발견: 줄 {} (신호: {})", actual_end_line + 1, i)
     
-    print(f"수집 완료: 시작줄 {len(start_lines)}개, 종료줄 {len(end_lines)}개")
+    print(f"수집 완료: 시작줄 {len(index.start_lines)}개, 종료줄 {len(index.end_lines)}개")
+    return index
+
+def calculate_problems_with_algorithm(input_file: Path, store: LineStore = None, index: SignalIndex = None):
+    """시작 줄과 종료 줄 정보를 바탕으로 문제 분할 알고리즘을 적용하는 핵심 함수
+
+    store가 있으면 파일을 다시 읽지 않고, index가 있으면 신호를 다시 수집하지 않는다.
+    """
+    print(f"\n=== 알고리즘으로 문제 분할 계산 ===")
+    
+    if store is None:
+        store = LineStore.read(input_file)
+    if index is None:
+        index = build_signal_index(store)
+    lines = store.raw
     
     print("\n2단계: 유한 상태 기계 알고리즘 적용")
     print("알고리즘 설명:")
@@ -342,53 +499,56 @@ def calculate_problems_with_algorithm(input_file: Path):
     last_start_line = 0
     problems = []
     total_lines = len(lines)
+    # 줄마다 리스트를 훑지 않도록 집합으로 확인
+    start_set = index.start_set
+    end_set = index.end_set
     
     for line_num in range(1, total_lines + 1):
-        is_start = line_num in start_lines
-        is_end = line_num in end_lines
+        is_start = line_num in start_set
+        is_end = line_num in end_set
         
         if is_start and is_end:
-            print(f"  줄 {line_num}: 시작줄과 종료줄이 같은 줄, condition=0으로 변경")
+            TRACE.info("  줄 {}: 시작줄과 종료줄이 같은 줄, condition=0으로 변경", line_num)
             condition = 0
             problem_range = (last_end_line + 1, line_num)
             problems.append(problem_range)
-            print(f"  문제 {len(problems)}: 줄 {problem_range[0]}~{problem_range[1]} (시작=종료줄 {line_num})")
+            TRACE.info("  문제 {}: 줄 {}~{} (시작=종료줄 {})", len(problems), problem_range[0], problem_range[1], line_num)
             last_end_line = line_num
             continue
         
         if condition == 0:
             if is_start:
-                print(f"  줄 {line_num}: 시작줄 발견, condition=1로 전이")
+                TRACE.info("  줄 {}: 시작줄 발견, condition=1로 전이", line_num)
                 last_start_line = line_num
                 condition = 1
             elif is_end:
-                print(f"  줄 {line_num}: 종료줄 발견, condition=0 유지")
+                TRACE.info("  줄 {}: 종료줄 발견, condition=0 유지", line_num)
                 problem_range = (last_end_line + 1, line_num)
                 problems.append(problem_range)
-                print(f"  문제 {len(problems)}: 줄 {problem_range[0]}~{problem_range[1]} (종료줄 {line_num})")
+                TRACE.info("  문제 {}: 줄 {}~{} (종료줄 {})", len(problems), problem_range[0], problem_range[1], line_num)
                 last_end_line = line_num
                 condition = 0
                 
         elif condition == 1:
             if is_start:
-                print(f"  줄 {line_num}: 새 시작줄 발견, 이전 문제 종료 후 새 문제 시작")
+                TRACE.info("  줄 {}: 새 시작줄 발견, 이전 문제 종료 후 새 문제 시작", line_num)
                 problem_range = (last_start_line, line_num - 1)
                 problems.append(problem_range)
-                print(f"  문제 {len(problems)}: 줄 {problem_range[0]}~{problem_range[1]} (새 시작줄 {line_num} 전)")
+                TRACE.info("  문제 {}: 줄 {}~{} (새 시작줄 {} 전)", len(problems), problem_range[0], problem_range[1], line_num)
                 last_start_line = line_num
                 condition = 1
             elif is_end:
-                print(f"  줄 {line_num}: 종료줄 발견, 현재 문제 종료, condition=0으로 전이")
+                TRACE.info("  줄 {}: 종료줄 발견, 현재 문제 종료, condition=0으로 전이", line_num)
                 problem_range = (last_start_line, line_num)
                 problems.append(problem_range)
-                print(f"  문제 {len(problems)}: 줄 {problem_range[0]}~{problem_range[1]} (시작줄 {last_start_line}~종료줄 {line_num})")
+                TRACE.info("  문제 {}: 줄 {}~{} (시작줄 {}~종료줄 {})", len(problems), problem_range[0], problem_range[1], last_start_line, line_num)
                 last_end_line = line_num
                 condition = 0
             elif line_num == total_lines:
-                print(f"  줄 {line_num}: 마지막 줄 도달, 현재 문제 종료")
+                TRACE.info("  줄 {}: 마지막 줄 도달, 현재 문제 종료", line_num)
                 problem_range = (last_start_line, line_num)
                 problems.append(problem_range)
-                print(f"  문제 {len(problems)}: 줄 {problem_range[0]}~{problem_range[1]} (마지막 시작줄 {last_start_line}~마지막줄 {line_num})")
+                TRACE.info("  문제 {}: 줄 {}~{} (마지막 시작줄 {}~마지막줄 {})", len(problems), problem_range[0], problem_range[1], last_start_line, line_num)
                 last_end_line = line_num
                 condition = 0
     
@@ -396,65 +556,45 @@ def calculate_problems_with_algorithm(input_file: Path):
         print("3단계: 마지막 시작줄 처리")
         problem_range = (last_start_line, total_lines)
         problems.append(problem_range)
-        print(f"  문제 {len(problems)}: 줄 {problem_range[0]}~{problem_range[1]} (마지막 시작줄 {last_start_line}~마지막줄 {total_lines})")
+        TRACE.info("  문제 {}: 줄 {}~{} (마지막 시작줄 {}~마지막줄 {})", len(problems), problem_range[0], problem_range[1], last_start_line, total_lines)
     
     print(f"\n총 {len(problems)}개 문제로 분할됨")
     return problems
 
-def save_problems_to_json(problems, input_file: Path, output_file: Path):
-    """분할된 문제들을 JSON 파일로 저장하는 함수"""
+def save_problems_to_json(problems, input_file: Path, output_file: Path, store: LineStore = None,
+                          index: SignalIndex = None):
+    """분할된 문제들을 JSON 파일로 저장하는 함수
+
+    store/index가 있으면 파일을 다시 읽거나 신호를 다시 수집하지 않는다.
+    """
     print("\n=== 문제 분할 결과를 JSON으로 저장 ===")
     
-    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
-        lines = f.readlines()
-    
-    print("1단계: 시작/종료 줄 정보 재수집 (페이지 정보 포함)")
-    start_lines = []
-    end_lines = []
-    current_page = 1
-    
-    for i, line in enumerate(lines, 1):
-        line = line.rstrip('\n')
-        det = norm_for_detection(line)
-        
-        page_match = PAGE_MARK.match(det)
-        if page_match:
-            current_page = int(page_match.group(1))
-            continue
-        
-        if QUESTION_RX.match(det):
-            start_lines.append({'line': i, 'page': current_page})
-        
-        if QUESTION_END_RX.search(det) and not IMAGE_LINK_RX.search(det):
-            if not (CHOICE_LINE_RX.match(det) and not QUESTION_RX.match(det)):
-                actual_end_line = find_actual_end_line(lines, i, current_page, [], [])
-                end_lines.append({'line': actual_end_line + 1, 'page': current_page})
-    
-    print(f"수집 완료: 시작줄 {len(start_lines)}개, 종료줄 {len(end_lines)}개")
+    if store is None:
+        store = LineStore.read(input_file)
+    if index is None:
+        index = build_signal_index(store)
+    else:
+        print(f"1단계: 분할 때 수집한 신호 재사용 (시작줄 {len(index.start_lines)}개, 종료줄 {len(index.end_lines)}개)")
+    lines = store.raw
     
     print("2단계: 문제 내용 추출 및 JSON 데이터 생성")
     problems_data = []
+    start_set = index.start_set
+    end_set = index.end_set
     
     for i, (start_line, end_line) in enumerate(problems, 1):
-        print(f"  문제 {i} 처리 중: 줄 {start_line}~{end_line}")
+        TRACE.info("  문제 {} 처리 중: 줄 {}~{}", i, start_line, end_line)
         
         problem_content = []
         for line_idx in range(start_line - 1, end_line):
             if 0 <= line_idx < len(lines):
-                problem_content.append(lines[line_idx].rstrip('\n'))
+                problem_content.append(lines[line_idx])
         
-        problem_page = None
-        current_page_scan = 1
-        for line_idx in range(start_line):
-            if line_idx < len(lines):
-                det_scan = norm_for_detection(lines[line_idx].rstrip('\n'))
-                page_match_scan = PAGE_MARK.match(det_scan)
-                if page_match_scan:
-                    current_page_scan = int(page_match_scan.group(1))
-        problem_page = current_page_scan
+        # 시작 줄까지 마지막으로 나온 페이지 마크 (미리 계산한 줄 → 페이지 배열)
+        problem_page = store.page_at(start_line - 1)
         
-        is_start_start = start_line in [s['line'] for s in start_lines]
-        is_start_end = end_line in [e['line'] for e in end_lines]
+        is_start_start = start_line in start_set
+        is_start_end = end_line in end_set
         
         if is_start_start and is_start_end:
             classification = "start-end"
@@ -473,7 +613,7 @@ def save_problems_to_json(problems, input_file: Path, output_file: Path):
         }
         
         problems_data.append(problem_data)
-        print(f"    분류: {classification}, 페이지: {problem_page}, 내용 길이: {len(problem_content)}줄")
+        TRACE.info("    분류: {}, 페이지: {}, 내용 길이: {}줄", classification, problem_page, len(problem_content))
     
     print("3단계: JSON 파일로 저장")
     
@@ -542,22 +682,95 @@ def select_sample_interactive():
             print("\n\n종료합니다.")
             sys.exit(0)
 
+# =============================================================================
+# 벤치마크 섹션 (문서 길이에 따라 분할 시간이 선형으로 느는지 확인)
+# =============================================================================
+
+BENCH_PAGES = (250, 500, 1000)
+
+def synthetic_paged_mmd(num_pages: int) -> str:
+    """history 샘플의 필터링된 페이지를 돌려 써서 num_pages 페이지짜리 paged mmd 생성"""
+    bodies = []
+    for sample_dir in find_sample_dirs():
+        p = sample_dir / "result.paged.filtered.mmd"
+        if not p.exists():
+            continue
+        store = LineStore.read(p)
+        marks = list(store.marks) + [len(store)]
+        for a, b in zip(marks, marks[1:]):
+            bodies.append(store.raw[a + 1:b])
+    if not bodies:
+        raise SystemExit("history 폴더에서 result.paged.filtered.mmd 파일을 찾을 수 없습니다.")
+
+    out = []
+    for k in range(num_pages):
+        out.append(f"<<<PAGE {k + 1}>>>")
+        out.extend(bodies[k % len(bodies)])
+    return "\n".join(out)
+
+def run_bench(sizes=BENCH_PAGES):
+    """합성 문서 크기별 분할+JSON 저장 시간 (디버그 출력은 버림)"""
+    import time
+    import tempfile
+    from contextlib import redirect_stdout
+
+    per_page = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            src = Path(tmp) / f"bench_{n}.mmd"
+            src.write_text(synthetic_paged_mmd(n), encoding="utf-8")
+            out = Path(tmp) / f"bench_{n}.json"
+            t0 = time.perf_counter()
+            with open(os.devnull, "w", encoding="utf-8") as devnull, redirect_stdout(devnull):
+                store = LineStore.read(src)
+                index = build_signal_index(store)
+                problems = calculate_problems_with_algorithm(src, store, index)
+                save_problems_to_json(problems, src, out, store, index)
+            elapsed = time.perf_counter() - t0
+            per_page.append(elapsed / n)
+            print(f"[BENCH] {n:>5}페이지 {len(store):>7,}줄, 문제 {len(problems):>5}개: "
+                  f"{elapsed:.2f}초 (페이지당 {elapsed / n * 1000:.2f}ms)")
+    print(f"[BENCH] 페이지당 시간 {sizes[0]}p → {sizes[-1]}p: {per_page[-1] / per_page[0]:.2f}배 (1에 가까우면 선형)")
+
 def main():
     """
     기존 호출 방식과 호환되는 main 함수
     app.cjs에서 pipeline/split.py를 직접 호출할 때 사용
     """
+    global TRACE
+
     parser = argparse.ArgumentParser(description="문제 분할 스크립트")
     parser.add_argument("--sample", type=str, help="history 폴더의 샘플 번호 (예: sample1)")
+    parser.add_argument("--bench", action="store_true",
+                        help=f"history 샘플 페이지로 만든 {'/'.join(map(str, BENCH_PAGES))}페이지 합성 문서로 분할 시간 측정")
+    parser.add_argument("--trace-level", choices=list(TRACE_LEVELS), default=os.getenv("SPLIT_TRACE"),
+                        help="판단 기록 출력 수준 (기본: 서버 모드 off, --sample/대화형 debug, 환경변수 SPLIT_TRACE)")
+    parser.add_argument("--trace-ring", type=int, default=int(os.getenv("SPLIT_TRACE_RING", DEFAULT_TRACE_RING)),
+                        help=f"실패 시 출력할 마지막 판단 개수 (기본: {DEFAULT_TRACE_RING})")
+    parser.add_argument("--trace-file", type=str, default=os.getenv("SPLIT_TRACE_FILE"),
+                        help="모든 판단을 JSONL로 기록할 파일 (기본: 기록 안 함)")
+    add_job_args(parser)
 
     args = parser.parse_args()
+    if args.bench:
+        run_bench()
+        return
+    job_dir = resolve_job_dir(args)
 
     print("=" * 80)
     print("최적화된 문제 분할 스크립트")
     print("=" * 80)
 
     # 모드 결정
-    if args.sample:
+    if job_dir:
+        # 서버 모드(작업 폴더): 작업 폴더 안에서 읽고 씀
+        input_file = job_dir / "result.paged.filtered.mmd"
+        if not input_file.exists():
+            print(f"입력 파일을 찾을 수 없습니다: {input_file}")
+            return
+
+        output_file = job_dir / "problems.json"
+    elif args.sample:
         # 테스트 모드: --sample 옵션 사용
         sample_path = Path(f"history/{args.sample}")
         if not sample_path.exists():
@@ -619,19 +832,37 @@ def main():
 
     print(f"[*] 입력: {input_file}")
 
-    # 문제 분할 실행
-    problems = calculate_problems_with_algorithm(input_file)
+    # 서버 모드(작업 폴더, 또는 --sample 없이 파이프로 실행)에서는 줄 단위 기록을 출력하지 않음
+    trace_level = args.trace_level
+    if trace_level is None:
+        server_mode = job_dir is not None or (not args.sample and not sys.stdin.isatty())
+        trace_level = "off" if server_mode else "debug"
+    TRACE = SplitTracer(trace_level, max(1, args.trace_ring), args.trace_file)
 
-    if problems:
-        # JSON 파일로 저장
-        save_problems_to_json(problems, input_file, output_file)
+    try:
+        # 입력은 한 번만 읽고 정규화하고, 시작/종료 신호도 한 번만 수집해서 두 단계가 같이 씀
+        store = LineStore.read(input_file)
+        index = build_signal_index(store)
 
-        print(f"\n[성공] 문제 분할이 성공적으로 완료되었습니다!")
-        print(f"   결과 파일: {output_file}")
-        print(f"   총 {len(problems)}개의 문제가 분할되어 저장되었습니다.")
-    else:
-        print("\n[실패] 문제 분할에 실패했습니다.")
-        print("   시작 줄이나 종료 줄이 제대로 감지되지 않았을 수 있습니다.")
+        # 문제 분할 실행
+        problems = calculate_problems_with_algorithm(input_file, store, index)
+
+        if problems:
+            # JSON 파일로 저장
+            save_problems_to_json(problems, input_file, output_file, store, index)
+
+            print(f"\n[성공] 문제 분할이 성공적으로 완료되었습니다!")
+            print(f"   결과 파일: {output_file}")
+            print(f"   총 {len(problems)}개의 문제가 분할되어 저장되었습니다.")
+        else:
+            print("\n[실패] 문제 분할에 실패했습니다.")
+            print("   시작 줄이나 종료 줄이 제대로 감지되지 않았을 수 있습니다.")
+            TRACE.dump("문제 분할 실패")
+    except Exception:
+        TRACE.dump("문제 분할 중 오류")
+        raise
+    finally:
+        TRACE.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+webhook_receiver.py - Mathpix 변환 완료 콜백을 받는 작은 로컬 HTTP 서버
+상태 조회(폴링) 대신 업로드할 때 콜백 URL을 등록해 두고, 완료 알림이 오면 결과를 받는다.
+
+  콜백 URL: <public_url>/<token>/<page_no>
+    - token: 실행마다 새로 만드는 난수 (다른 작업/오래된 콜백 구분)
+    - page_no: 1-base 페이지 번호
+  본문(JSON)은 그대로 전달하고, "status"가 error/failed면 실패로 본다.
+
+app.cjs가 업로드마다 convert_pdf.py를 따로 띄우므로 한 호스트의 여러 작업이 같은 포트를 쓴다.
+  - 포트를 먼저 잡은 작업이 수신 서버를 돌리고, 다른 작업 토큰으로 온 콜백은
+    호스트 공용 스풀 폴더(<spool>/<token>/<page_no>.json)에 떨어뜨린다
+  - 포트를 못 잡은 작업은 스풀 폴더에서 자기 토큰 콜백만 읽고,
+    수신 서버를 돌리던 작업이 끝나면 다음 drain()에서 포트를 이어받는다
+  - 스풀에 토큰 폴더가 없는(끝났거나 모르는) 토큰의 콜백은 404로 거절한다
+
+public_url은 Mathpix가 접근할 수 있는 주소여야 한다 (리버스 프록시로 이 포트에 연결).
+테스트에서는 notify()를 직접 호출하거나 로컬 주소로 POST하면 된다.
+"""
+
+import os
+import json
+import time
+import errno
+import queue
+import shutil
+import secrets
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+DEFAULT_PORT = 8089
+TAKEOVER_INTERVAL = 1.0   # 포트를 못 잡은 작업이 다시 잡아 보는 간격(초)
+SPOOL_POLL = 0.05         # 스풀 폴더를 다시 보는 간격(초)
+
+
+def default_spool_dir(port: int) -> Path:
+    root = Path(os.getenv("MATHPIX_WEBHOOK_DIR", tempfile.gettempdir()))
+    return root / f"mathpix_webhook_{port}"
+
+
+def _make_handler(owner: "CompletionReceiver"):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def reply(self, code: int, body: bytes = b""):
+            self.send_response(code)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            parts = self.path.split("?", 1)[0].strip("/").split("/")
+            if len(parts) < 2 or not parts[-2].isalnum() or not parts[-1].isdigit():
+                owner.rejected += 1
+                return self.reply(404)
+            token, page_no = parts[-2], int(parts[-1])
+            try:
+                payload = json.loads(body.decode("utf-8")) if body else {}
+            except ValueError:
+                payload = {}
+            if not isinstance(payload, dict):
+                payload = {"body": payload}
+
+            if token == owner.token:
+                owner.notify(page_no - 1, payload)
+                return self.reply(200, b"ok")
+            token_dir = owner.spool / token
+            if not token_dir.is_dir():
+                owner.rejected += 1
+                return self.reply(404)
+            tmp = token_dir / f".{page_no}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, token_dir / f"{page_no}.json")
+            except OSError:
+                return self.reply(503)  # 그 사이 작업이 끝나 폴더가 지워짐
+            self.reply(200, b"ok")
+
+    return Handler
+
+
+class CompletionReceiver:
+    """콜백을 받아 (page_idx, payload) 이벤트 큐에 쌓는 수신기 (백그라운드 스레드)
+
+    포트가 이미 다른 작업의 수신 서버에 잡혀 있으면 그 서버를 같이 쓰고(스풀 폴더로 전달받음),
+    그 외의 바인드 실패(권한 등)는 OSError 그대로 올린다.
+    """
+
+    def __init__(self, public_url: str, host: str = "0.0.0.0", port: int = DEFAULT_PORT,
+                 spool_dir: Path = None):
+        self.public_url = public_url.rstrip("/")
+        self.token = secrets.token_hex(8)
+        self.host = host
+        self.port = port
+        self.events: "queue.Queue[Tuple[int, dict]]" = queue.Queue()
+        self.received = 0
+        self.rejected = 0
+        self.spool: Optional[Path] = None
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.served = False  # 한 번이라도 직접 수신 서버를 돌렸는지
+        self._thread = None
+        self._next_takeover = 0.0
+
+        if port == 0:
+            self._serve()  # 빈 포트 자동 선택이면 공유할 일이 없음
+        self.spool = Path(spool_dir) if spool_dir else default_spool_dir(self.port)
+        self.token_dir = self.spool / self.token
+        self.token_dir.mkdir(parents=True, exist_ok=True)
+        if self.server is None:
+            self._try_serve()
+
+    @property
+    def serving(self) -> bool:
+        return self.server is not None
+
+    def _serve(self):
+        self.server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self.port = self.server.server_address[1]
+        self.served = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def _try_serve(self):
+        """포트를 잡아 수신 서버를 돌려 보고, 다른 작업이 잡고 있으면 스풀만 읽는다"""
+        self._next_takeover = time.time() + TAKEOVER_INTERVAL
+        try:
+            self._serve()
+        except OSError as e:
+            if e.errno != errno.EADDRINUSE:
+                raise
+
+    def callback_url(self, page_idx: int) -> str:
+        return f"{self.public_url}/{self.token}/{page_idx + 1}"
+
+    def notify(self, page_idx: int, payload: dict):
+        """완료 이벤트 넣기 (HTTP 핸들러와 테스트에서 호출)"""
+        self.received += 1
+        self.events.put((page_idx, payload))
+
+    def _read_spool(self):
+        """다른 작업의 수신 서버가 스풀에 떨어뜨린 내 토큰 콜백을 이벤트 큐로 옮김"""
+        try:
+            files = [p for p in self.token_dir.iterdir() if p.suffix == ".json"]
+        except OSError:
+            return
+        for path in files:
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+                path.unlink()
+            except (OSError, ValueError):
+                continue
+            self.notify(int(path.stem) - 1, payload)
+
+    def drain(self, timeout: float = 0.0) -> List[Tuple[int, dict]]:
+        """쌓인 이벤트 모두 꺼내기, 없으면 timeout초까지 첫 이벤트를 기다림"""
+        if not self.serving and time.time() >= self._next_takeover:
+            try:
+                self._try_serve()
+            except OSError:
+                pass  # 이어받기 실패는 다음 간격에 다시 시도
+        deadline = time.time() + timeout
+        items = []
+        while True:
+            self._read_spool()
+            try:
+                while True:
+                    items.append(self.events.get_nowait())
+            except queue.Empty:
+                pass
+            remaining = deadline - time.time()
+            if items or remaining <= 0:
+                return items
+            try:
+                items.append(self.events.get(timeout=min(SPOOL_POLL, remaining)))
+            except queue.Empty:
+                pass
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        shutil.rmtree(self.token_dir, ignore_errors=True)
+
+    def summary(self) -> str:
+        mode = "수신 서버 운영" if self.served else "다른 작업의 수신 서버 공유"
+        return f"콜백 {self.received}건 수신, 거부 {self.rejected}건 (포트 {self.port}, {mode})"
@@ -0,0 +1,69 @@
+"""
+빈/중복 페이지 판정(page_dedup) 회귀 테스트
+래스터 지각 해시가 같아도 문제 번호처럼 텍스트가 다른 페이지는 중복으로 묶으면 안 된다.
+"""
+
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "pipeline"))
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+import page_dedup
+from page_dedup import find_blank_and_duplicates
+
+
+def text_pdf(contents) -> PdfReader:
+    """페이지마다 주어진 content stream으로 텍스트를 그린 PDF"""
+    writer = PdfWriter()
+    font = DictionaryObject({NameObject("/Type"): NameObject("/Font"),
+                             NameObject("/Subtype"): NameObject("/Type1"),
+                             NameObject("/BaseFont"): NameObject("/Helvetica")})
+    for content in contents:
+        page = writer.add_blank_page(300, 400)
+        stream = DecodedStreamObject()
+        stream.set_data(content.encode("latin-1"))
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})})
+    bio = io.BytesIO()
+    writer.write(bio)
+    bio.seek(0)
+    return PdfReader(bio)
+
+
+def problem(text: str, extra: str = "") -> str:
+    return f"BT /F1 12 Tf 20 350 Td ({text}) Tj ET{extra}"
+
+
+@pytest.fixture
+def same_raster(monkeypatch):
+    """모든 페이지의 래스터 지문을 같게 (여백 많은 시험지에서 dHash가 겹치는 상황)"""
+    monkeypatch.setattr(page_dedup, "raster_fingerprints",
+                        lambda pdf_path, dpi=page_dedup.DEDUP_DPI: [(0.01, 0)] * 3)
+
+
+def test_near_duplicates_are_off_by_default(same_raster):
+    reader = text_pdf([problem("1. x+1=2"), problem("1. x+1=2", " "), problem("2. x+1=3")])
+    found = find_blank_and_duplicates(reader, Path("unused.pdf"))
+    assert found.duplicates == {}
+    assert found.near == 0
+
+
+def test_near_duplicate_requires_matching_text_layer(same_raster):
+    reader = text_pdf([problem("1. x+1=2"), problem("1. x+1=2", " "), problem("2. x+1=3")])
+    found = find_blank_and_duplicates(reader, Path("unused.pdf"),
+                                      near_max_distance=page_dedup.NEAR_SUGGESTED_DISTANCE)
+    assert found.duplicates == {0: [1]}
+    assert found.near == 1
+
+
+def test_exact_duplicates_still_found_without_near(same_raster):
+    reader = text_pdf([problem("1. x+1=2"), problem("2. x+1=3"), problem("1. x+1=2")])
+    found = find_blank_and_duplicates(reader, Path("unused.pdf"))
+    assert found.duplicates == {0: [2]}
+    assert found.exact == 1
@@ -0,0 +1,92 @@
+"""
+웹훅 완료 모드 + 사용자별 공정 분배(--webhook-url --fair-share) 회귀 테스트
+공용 슬롯 한도가 작고 업로드 대기열이 스레드 수보다 길어도 멈추지 않고 끝나야 한다.
+"""
+
+import io
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "pipeline"))
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+import convert_pdf
+from fair_share import FairShareScheduler
+
+NUM_PAGES = 7
+
+
+class FakeReceiver:
+    """업로드 직후 완료 콜백을 흉내 내는 수신기 (HTTP 서버 없이 이벤트만 쌓음)"""
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def callback_url(self, page_idx: int) -> str:
+        return f"http://callback/{page_idx}"
+
+    def notify_later(self, page_idx: int):
+        def fire():
+            time.sleep(0.05)
+            with self.lock:
+                self.events.append((page_idx, {"status": "completed"}))
+        threading.Thread(target=fire, daemon=True).start()
+
+    def drain(self, timeout: float = 0.0):
+        time.sleep(timeout)
+        with self.lock:
+            events, self.events = self.events, []
+        return events
+
+
+def blank_pdf(num_pages: int) -> PdfReader:
+    writer = PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(100, 100)
+    bio = io.BytesIO()
+    writer.write(bio)
+    bio.seek(0)
+    return PdfReader(bio)
+
+
+@pytest.fixture
+def fake_mathpix(monkeypatch):
+    receiver = FakeReceiver()
+    uploads = iter(range(10_000))
+
+    def upload(pdf_bytes, headers, options_json):
+        page_idx = int(options_json.split("http://callback/")[1].split('"')[0])
+        receiver.notify_later(page_idx)
+        return f"id{next(uploads)}"
+
+    monkeypatch.setattr(convert_pdf, "mathpix_upload_and_get_id", upload)
+    monkeypatch.setattr(convert_pdf, "download_mmd", lambda pdf_id, headers: f"mmd {pdf_id}")
+    return receiver
+
+
+def test_webhook_with_small_fair_share_capacity_does_not_deadlock(fake_mathpix, monkeypatch, tmp_path):
+    scheduler = FairShareScheduler("mathpix", "user", "job", NUM_PAGES, capacity=2,
+                                   path=tmp_path / "fair_share_mathpix.json")
+    monkeypatch.setattr(convert_pdf, "SCHEDULER", scheduler)
+    reader = blank_pdf(NUM_PAGES)
+    out = {}
+
+    def run():
+        out["results"] = convert_pdf.process_pages_webhook(reader, {}, fake_mathpix,
+                                                           max_workers=2, max_outstanding=8)
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    t.join(30)
+    deadlocked = t.is_alive()
+    if deadlocked:
+        scheduler.capacity = 1000  # 막힌 워커를 풀어 테스트 프로세스가 끝나게 함
+        t.join(10)
+
+    assert not deadlocked, "웹훅 + 공정 분배에서 슬롯을 기다리다 멈춤"
+    assert [page_idx for page_idx, _ in out["results"]] == list(range(NUM_PAGES))
@@ -0,0 +1,84 @@
+"""
+웹훅 콜백 수신기(CompletionReceiver) 회귀 테스트
+같은 포트로 여러 변환 작업이 동시에 떠도 바인드 실패 없이 각자 자기 콜백만 받아야 한다.
+"""
+
+import json
+import socket
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "pipeline"))
+
+import pytest
+
+import webhook_receiver
+from webhook_receiver import CompletionReceiver
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def post(port: int, path: str, payload: dict) -> int:
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=json.dumps(payload).encode(),
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def drain_until(receiver: CompletionReceiver, count: int, timeout: float = 5.0):
+    events = []
+    deadline = time.time() + timeout
+    while len(events) < count and time.time() < deadline:
+        events += receiver.drain(timeout=0.1)
+    return events
+
+
+@pytest.fixture
+def receivers(tmp_path):
+    port = free_port()
+    made = []
+
+    def make():
+        r = CompletionReceiver("http://hook", host="127.0.0.1", port=port, spool_dir=tmp_path)
+        made.append(r)
+        return r
+
+    yield port, make
+    for r in made:
+        r.close()
+
+
+def test_second_job_on_same_port_shares_the_listener(receivers):
+    port, make = receivers
+    first, second = make(), make()
+    assert first.serving and not second.serving
+
+    assert post(port, f"/{first.token}/1", {"status": "completed"}) == 200
+    assert post(port, f"/{second.token}/3", {"status": "completed"}) == 200
+    assert post(port, "/deadbeef/1", {"status": "completed"}) == 404
+
+    assert drain_until(first, 1) == [(0, {"status": "completed"})]
+    assert drain_until(second, 1) == [(2, {"status": "completed"})]
+    assert first.rejected == 1
+
+
+def test_listener_is_taken_over_when_the_serving_job_ends(receivers, monkeypatch):
+    monkeypatch.setattr(webhook_receiver, "TAKEOVER_INTERVAL", 0.0)
+    port, make = receivers
+    first, second = make(), make()
+    first.close()
+
+    second.drain()
+    assert second.serving
+    assert post(port, f"/{second.token}/2", {"status": "completed"}) == 200
+    assert drain_until(second, 1) == [(1, {"status": "completed"})]